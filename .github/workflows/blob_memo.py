@@ -0,0 +1,69 @@
+# Verdicts of the file classifiers, keyed by the git blob id of the file they were computed from
+import json
+import os
+
+# Where the verdicts are kept between runs (restored by the Actions cache)
+DEFAULT_MEMO_PATH = os.path.join('.cache', 'blob-verdicts.json')
+
+# The least recently used blobs are dropped past this many entries
+MAX_MEMO_ENTRIES = 200_000
+
+class BlobMemo:
+    """
+    Content-addressed memo of the verdicts of the file classifiers (VBA code, binary, class header,
+    double LF header). Forks and copies of the same project share most of their blobs, so a blob
+    seen in any repo or in any previous run is answered without opening the file again.
+    """
+
+    def __init__(self, entries=None, max_entries=MAX_MEMO_ENTRIES):
+        self.entries = dict(entries or {})
+        self.max_entries = max_entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, blob_id, verdict):
+        """Return the stored verdict for the blob, or None if it was never computed."""
+        verdicts = self.entries.get(blob_id)
+        if verdicts is None or verdict not in verdicts:
+            return None
+        # Most recently used last, so that the oldest entries are the first to go
+        self.entries[blob_id] = self.entries.pop(blob_id)
+        return verdicts[verdict]
+
+    def set(self, blob_id, verdict, value):
+        verdicts = self.entries.pop(blob_id, {})
+        verdicts[verdict] = value
+        self.entries[blob_id] = verdicts
+        while len(self.entries) > self.max_entries:
+            del self.entries[next(iter(self.entries))]
+
+    def verdict(self, blob_id, verdict, compute):
+        """Return the verdict for the blob, calling compute() and storing its result if it isn't known."""
+        value = self.get(blob_id, verdict)
+        if value is not None:
+            return value
+        value = compute()
+        self.set(blob_id, verdict, value)
+        return value
+
+    def save(self, path=DEFAULT_MEMO_PATH):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(self.entries, file, separators=(',', ':'))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_MEMO_PATH):
+        """Read a memo written by save(), or return an empty memo if there is none."""
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                return cls(json.load(file))
+        except (OSError, ValueError) as e:
+            print(f"🟡 Ignoring the blob verdicts memo: {e}")
+            return cls()
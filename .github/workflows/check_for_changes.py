@@ -3,7 +3,6 @@
 # - Filter by check/issue
 
 
-import requests
 import os
 import sys
 import re
@@ -11,9 +10,16 @@ import re
 # Custom modules
 import gh
 import utils
+from github_client import get_client
+from clone_pool import ClonePool
+from workspace import Workspace
+from blob_memo import BlobMemo
 
 all_open_issues = None
 
+# Pool cloning the repos of the next issues while the current one is followed up (set during follow_up_issues)
+clone_pool = None
+
 def detect_repository_rename(original_user, original_repo_name, repo_info):
     """
     Detect if a repository was renamed by comparing original name with current repo info.
@@ -69,15 +75,7 @@ def update_issue_for_renamed_repo(token, repo_slug, issue, rename_info):
         )
         
         # Update the issue title and body
-        url = f"https://api.github.com/repos/{repo_slug}/issues/{issue['number']}"
-        headers = {
-            'Accept': 'application/vnd.github.v3+json',
-            'Authorization': f'token {token}'
-        }
-        data = {'title': new_title, 'body': new_body}
-        response = requests.patch(url, headers=headers, json=data)
-        
-        if response.status_code == 200:
+        if gh.update_issue(token, repo_slug, issue['number'], new_body, title=new_title):
             print(f"✅ Updated issue title and body for renamed repo: '{rename_info['original_name']}' -> '{rename_info['current_name']}'")
             
             # Uncomment the following section to add a comment about the rename
@@ -88,65 +86,110 @@ def update_issue_for_renamed_repo(token, repo_slug, issue, rename_info):
             # gh.write_comment(token, repo_slug, issue, comment)
             
         else:
-            print(f"🔴 Failed to update issue. Status code: {response.status_code}")
+            print(f"🔴 Failed to update issue #{issue['number']} for renamed repo.")
             
     except Exception as e:
         print(f"🔴 Error updating issue for renamed repo: {e}")
 
 def follow_up_issues(token, repo_slug):
-    global all_open_issues
-    
-    for issue in all_open_issues:
+    global all_open_issues, clone_pool
 
-        # See what Check is associated with the issue
-        # The Check is based on the label (Check A, Check B, etc)
-        check = gh.get_check(issue)
-
-        if check == None:
-            continue
+    # Resolve the repository info of all the followed-up repos in a few batched GraphQL queries
+    repo_pairs = []
+    for issue in all_open_issues:
+        if gh.get_check(issue) is not None:
+            repo_pairs.append((utils.get_user_from_title(issue['title']), issue['title'].split('/')[1].split(']')[0]))
+    try:
+        repo_infos = get_repos_info_batch(token, repo_pairs)
+    except Exception as e:
+        print(f"🟡 Batched repo info lookup failed, falling back to one request per repo: {e}")
+        repo_infos = {}
 
-        # Extract the user and repo_name from the issue title
+    # The HEAD resolved by the GraphQL query saves the 'git ls-remote' of the clones kept from previous runs
+    for (user, repo_name), repo_info in repo_infos.items():
+        if repo_info.get('head_oid'):
+            gh.remote_heads[f"https://github.com/{user}/{repo_name}"] = repo_info['head_oid']
+    
+    def clone_url(issue):
+        # Every check is followed up on a clone, except for the repos that are gone
+        if gh.get_check(issue) is None:
+            return None
         user = utils.get_user_from_title(issue['title'])
         repo_name = issue['title'].split('/')[1].split(']')[0]
-        repo_url = "https://github.com/" + repo_slug
-
-        repo_info = get_repo_info(token, user, repo_name)
-        if not repo_info:
-            print(f"Failed to get repo info for issue: {issue['title']}")
-            continue
-
-        # Check if the repo was deleted or privated
-        if repo_info['status_code'] == 404:
-            print(f"Repo {user}/{repo_name} has been deleted, closing issue {issue['title']}")
-            gh.close_issue(token, repo_slug, issue, "not_planned")
-            gh.write_comment(token, repo_slug, issue, "Looks like the repository has been deleted or privated. Closing the issue.")
-            gh.add_label_to_issue(token, os.getenv('GITHUB_REPOSITORY'), issue['number'], "repo deleted")
-            continue
-        
-        # Check if the repository was renamed
-        rename_info = detect_repository_rename(user, repo_name, repo_info)
-        if rename_info['renamed']:
-            update_issue_for_renamed_repo(token, repo_slug, issue, rename_info)
-            # Update the issue object with the new title for subsequent processing
-            issue['title'] = issue['title'].replace(
-                f"[{user}/{repo_name}]",
-                f"[{user}/{rename_info['current_name']}]"
-            )
-        
-        if check == "A":
-            follow_up_check_A(token, repo_info, user, repo_name, issue)
-        elif check == "B":
-             follow_up_check_B(token, repo_info, user, repo_name, issue)
-        elif check == "C":
-             follow_up_check_C(token, repo_info, user, repo_name, issue)
-        elif check == "D":
-             follow_up_check_D(token, repo_info, user, repo_name, issue)
-        elif check == "E":
-             follow_up_check_E(token, repo_info, user, repo_name, issue)
-        elif check == "F":
-             follow_up_check_F(token, repo_info, user, repo_name, issue)
-        elif check == "G":
-             follow_up_check_G(token, repo_info, user, repo_name, issue)
+        repo_info = repo_infos.get((user, repo_name))
+        if repo_info is None or repo_info['status_code'] != 200:
+            return None
+        # Leased before the clone starts so that it can't be evicted while being cloned
+        workspace.lease(utils.repo_path(user, repo_name))
+        return f"https://github.com/{user}/{repo_name}"
+
+    workspace = Workspace()
+    with ClonePool() as pool:
+        clone_pool = pool
+        try:
+            for issue in pool.iterate(all_open_issues, clone_url):
+                user = utils.get_user_from_title(issue['title'])
+                repo_path = utils.repo_path(user, issue['title'].split('/')[1].split(']')[0]) if gh.get_check(issue) else None
+                try:
+                    follow_up_issue(token, repo_slug, issue, repo_infos)
+                finally:
+                    # The clone is only needed again while the issue stays open
+                    if repo_path is not None:
+                        record = gh.issues_by_number.get((repo_slug, issue['number']), issue)
+                        workspace.release(repo_path, keep=record.get('state', 'open') != 'closed')
+        finally:
+            clone_pool = None
+
+def follow_up_issue(token, repo_slug, issue, repo_infos):
+    # See what Check is associated with the issue
+    # The Check is based on the label (Check A, Check B, etc)
+    check = gh.get_check(issue)
+
+    if check == None:
+        return
+
+    # Extract the user and repo_name from the issue title
+    user = utils.get_user_from_title(issue['title'])
+    repo_name = issue['title'].split('/')[1].split(']')[0]
+    repo_url = "https://github.com/" + repo_slug
+
+    repo_info = repo_infos.get((user, repo_name)) or get_repo_info(token, user, repo_name)
+    if not repo_info:
+        print(f"Failed to get repo info for issue: {issue['title']}")
+        return
+
+    # Check if the repo was deleted or privated
+    if repo_info['status_code'] == 404:
+        print(f"Repo {user}/{repo_name} has been deleted, closing issue {issue['title']}")
+        gh.close_issue(token, repo_slug, issue, "not_planned")
+        gh.write_comment(token, repo_slug, issue, "Looks like the repository has been deleted or privated. Closing the issue.")
+        gh.add_label_to_issue(token, os.getenv('GITHUB_REPOSITORY'), issue['number'], "repo deleted")
+        return
+    
+    # Check if the repository was renamed
+    rename_info = detect_repository_rename(user, repo_name, repo_info)
+    if rename_info['renamed']:
+        update_issue_for_renamed_repo(token, repo_slug, issue, rename_info)
+        # Update the issue object with the new title for subsequent processing
+        issue['title'] = issue['title'].replace(
+            f"[{user}/{repo_name}]",
+            f"[{user}/{rename_info['current_name']}]"
+        )
+    
+    if check == "A":
+        follow_up_check_A(token, repo_info, user, repo_name, issue)
+    elif check == "B":
+         follow_up_check_B(token, repo_info, user, repo_name, issue)
+    elif check == "C":
+         follow_up_check_C(token, repo_info, user, repo_name, issue)
+    elif check == "D":
+         follow_up_check_D(token, repo_info, user, repo_name, issue)
+    elif check == "E":
+         follow_up_check_E(token, repo_info, user, repo_name, issue)
+    elif check == "F":
+         follow_up_check_F(token, repo_info, user, repo_name, issue)
+    elif check == "G":
+         follow_up_check_G(token, repo_info, user, repo_name, issue)
 
 
 def follow_up_check_A(token, repo_info, user, repo_name, issue):
@@ -518,13 +561,7 @@ def handle_labels_after_completion(token, main_repo_slug, issue_number):
     gh.remove_label_from_issue(token, main_repo_slug, issue_number, "partially completed", ignore_not_found=True) 
 
 def get_repo_info(token, user, repo_name):
-    url = f"https://api.github.com/repos/{user}/{repo_name}"
-    headers = {
-        'Accept': 'application/vnd.github.v3+json',
-        'Authorization': f'token {token}'
-    }
-    
-    response = requests.get(url, headers=headers)
+    response = get_client(token).get(f"/repos/{user}/{repo_name}", cache=True)
     
     if response.status_code == 200:
         repo_info = response.json()
@@ -538,6 +575,69 @@ def get_repo_info(token, user, repo_name):
         print(f"Failed to fetch repo info for {user}/{repo_name}. Status code: {response.status_code}")
         return None
 
+# Maximum number of repositories resolved by a single GraphQL query
+GRAPHQL_BATCH_SIZE = 100
+
+REPO_INFO_FIELDS = """
+    name
+    owner { login }
+    primaryLanguage { name }
+    pushedAt
+    defaultBranchRef { target { oid } }
+"""
+
+def get_repos_info_batch(token, repo_pairs, batch_size=GRAPHQL_BATCH_SIZE):
+    """
+    Resolve the info of many repositories with aliased GraphQL queries (up to batch_size repos per request).
+
+    Args:
+        token: GitHub token
+        repo_pairs: Iterable of (user, repo_name) tuples
+        batch_size: Number of repositories per query
+
+    Returns:
+        dict mapping (user, repo_name) to a repo_info dict shaped like get_repo_info's answer
+        (status_code, name, owner.login, language, pushed_at, plus head_oid, the SHA of HEAD).
+        Repos that couldn't be resolved are left out, including the NOT_FOUND ones: unlike the REST API,
+        GraphQL doesn't follow renames and transfers, so get_repo_info has to confirm that a repo is gone.
+    """
+    pairs = list(dict.fromkeys(repo_pairs))
+    repo_infos = {}
+
+    for start in range(0, len(pairs), batch_size):
+        batch = pairs[start:start + batch_size]
+        declarations = []
+        selections = []
+        variables = {}
+        for i, (user, repo_name) in enumerate(batch):
+            declarations.append(f"$owner{i}: String!, $name{i}: String!")
+            selections.append(f"r{i}: repository(owner: $owner{i}, name: $name{i}) {{{REPO_INFO_FIELDS}}}")
+            variables[f"owner{i}"] = user
+            variables[f"name{i}"] = repo_name
+        query = f"query({', '.join(declarations)}) {{\n" + "\n".join(selections) + "\n}"
+
+        answer = get_client(token).graphql(query, variables)
+        data = answer.get('data') or {}
+
+        for i, (user, repo_name) in enumerate(batch):
+            alias = f"r{i}"
+            repository = data.get(alias)
+            if repository:
+                target = (repository.get('defaultBranchRef') or {}).get('target') or {}
+                repo_infos[(user, repo_name)] = {
+                    'status_code': 200,
+                    'name': repository['name'],
+                    'owner': {'login': repository['owner']['login']},
+                    'full_name': f"{repository['owner']['login']}/{repository['name']}",
+                    'language': (repository.get('primaryLanguage') or {}).get('name'),
+                    'pushed_at': repository.get('pushedAt'),
+                    'head_oid': target.get('oid'),
+                }
+
+        print(f"Resolved {len(batch)} repositories with one GraphQL query")
+
+    return repo_infos
+
 def get_counts(token, user, repo_name):
     #This function is not implemented yet, return an error when called
     #print("Function has_vb_files not implemented yet.")
@@ -546,7 +646,10 @@ def get_counts(token, user, repo_name):
     # Clone the repo
     html_url = f"https://github.com/{user}/{repo_name}"
     try:
-        gh.clone_repo(html_url)
+        if clone_pool is not None:
+            clone_pool.wait(html_url)
+        else:
+            gh.clone_repo(html_url)
     except Exception as e:
         print(f"Error cloning the repo: {e}")
         return
@@ -559,7 +662,7 @@ def get_counts(token, user, repo_name):
         return
     
     try:
-        return gh.count_vba_related_files(repo_path)
+        return gh.get_vba_related_file_counts(repo_path)
     except Exception as e:
         print(f"🔴 Error counting VBA-related files: {e}")
         return
@@ -571,7 +674,13 @@ def main():
     token = os.getenv('GITHUB_TOKEN')
     all_open_issues = gh.get_all_issues(token, os.getenv('GITHUB_REPOSITORY'), 'open')
 
-    follow_up_issues(token, os.getenv('GITHUB_REPOSITORY'))
+    # Files already classified in another repo or run are answered by their blob id
+    gh.blob_memo = BlobMemo.load()
+    try:
+        follow_up_issues(token, os.getenv('GITHUB_REPOSITORY'))
+    finally:
+        gh.blob_memo.save()
+        gh.blob_memo = None
 
 
 if __name__ == "__main__":
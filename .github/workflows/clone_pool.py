@@ -0,0 +1,102 @@
+# Clones repos on worker threads ahead of their analysis
+import concurrent.futures
+import os
+import threading
+import time
+import urllib.parse
+
+import gh
+
+# Number of clones running at the same time
+CLONE_WORKERS = int(os.getenv('CLONE_WORKERS', '4'))
+
+# Politeness towards a single host: concurrent clones and minimum delay between two clone starts
+CLONES_PER_HOST = int(os.getenv('CLONES_PER_HOST', '4'))
+CLONE_INTERVAL = 0.5
+
+class ClonePool:
+    """
+    Starts the clones of the next repos in the background while the current one is analysed.
+
+    Only the clones run on the pool: the analysis and the issues it creates stay in the calling thread,
+    in the order of the repos, so that a run still behaves like the sequential one.
+    """
+
+    def __init__(self, clone=None, workers=CLONE_WORKERS, per_host=CLONES_PER_HOST, interval=CLONE_INTERVAL, sleep=time.sleep, clock=time.monotonic):
+        # gh.clone_repo is looked up on each call so that it can be replaced (sparse option, tests)
+        self.clone = clone or (lambda url: gh.clone_repo(url))
+        self.workers = workers
+        self.per_host = per_host
+        self.interval = interval
+        self.sleep = sleep
+        self.clock = clock
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        self.futures = {}
+        self.lock = threading.Lock()
+        self.host_slots = {}
+        self.last_start = {}
+
+    def _host_slot(self, host):
+        with self.lock:
+            if host not in self.host_slots:
+                self.host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self.host_slots[host]
+
+    def _clone(self, url):
+        host = urllib.parse.urlparse(url).netloc
+        with self._host_slot(host):
+            with self.lock:
+                start = max(self.clock(), self.last_start.get(host, float('-inf')) + self.interval)
+                self.last_start[host] = start
+            delay = start - self.clock()
+            if delay > 0:
+                self.sleep(delay)
+            return self.clone(url)
+
+    def submit(self, url):
+        """Start cloning url in the background (no-op if it was already started)."""
+        with self.lock:
+            if url not in self.futures:
+                self.futures[url] = self.executor.submit(self._clone, url)
+
+    def submitted(self, url):
+        """True if a clone of url was started and not waited for yet."""
+        with self.lock:
+            return url in self.futures
+
+    def wait(self, url):
+        """Return once url is cloned, re-raising the error of the clone if it failed. Clones now if it wasn't started."""
+        self.submit(url)
+        with self.lock:
+            future = self.futures.pop(url)
+        return future.result()
+
+    def iterate(self, items, url_of, lookahead=None):
+        """
+        Yield the items in order, with the clones of the next `lookahead` items already started.
+        url_of returns the URL to clone for an item, or None when the item won't be cloned.
+        """
+        items = list(items)
+        lookahead = lookahead or 2 * self.workers
+        started = set()
+        for position, item in enumerate(items):
+            for ahead in range(position, min(position + lookahead, len(items))):
+                if ahead in started:
+                    continue
+                started.add(ahead)
+                url = url_of(items[ahead])
+                if url:
+                    self.submit(url)
+            yield item
+
+    def close(self):
+        # Clones started for items that were never analysed are not awaited
+        for future in self.futures.values():
+            future.cancel()
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,57 @@
+# Times count_vba_related_files on a generated repo, serially and with an increasing number of worker processes
+# Usage: python count_benchmark.py [number of files] [maximum number of workers, the CPU count by default]
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import gh
+
+def make_repo(root, file_count):
+    """Mix of files that need a content probe: text with and without VBA code, extensionless, binary."""
+    filler = b"Lorem ipsum dolor sit amet, consectetur adipiscing elit.\n" * 400
+    for i in range(file_count):
+        folder = os.path.join(root, f"folder{i % 50}")
+        os.makedirs(folder, exist_ok=True)
+        kind = i % 4
+        if kind == 0:
+            name, content = f"notes{i}.txt", filler
+        elif kind == 1:
+            name, content = f"module{i}.txt", filler + b"Public Sub Main()\nEnd Sub\n"
+        elif kind == 2:
+            name, content = f"Script{i}", filler
+        else:
+            name, content = f"macro{i}.vbs", b"\x00" + filler
+        with open(os.path.join(folder, name), 'wb') as file:
+            file.write(content)
+    # Only the files tracked by git are counted
+    subprocess.run(["git", "init", "--quiet"], cwd=root, check=True)
+    subprocess.run(["git", "add", "-A"], cwd=root, check=True)
+
+def timed(repo_path, workers):
+    start = time.perf_counter()
+    counts = gh.count_vba_related_files(repo_path, workers=workers, threshold=0)
+    return time.perf_counter() - start, counts
+
+if __name__ == '__main__':
+    file_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    cpu_count = os.cpu_count() or 1
+    # At least one parallel run, even on a single CPU (where no speed-up is to be expected)
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else max(cpu_count, 2)
+    with tempfile.TemporaryDirectory() as repo_path:
+        make_repo(repo_path, file_count)
+
+        serial_time, serial_counts = timed(repo_path, 1)
+        results = [(1, serial_time)]
+        workers = 2
+        while workers <= max_workers:
+            elapsed, counts = timed(repo_path, workers)
+            if counts != serial_counts:
+                raise ValueError(f"Problem while benchmarking: {workers} workers returned {counts} instead of {serial_counts}")
+            results.append((workers, elapsed))
+            workers *= 2
+
+    print(f"\n{file_count} files to probe, {cpu_count} CPU(s), workers started with {gh.get_worker_context().get_start_method()}")
+    for workers, elapsed in results:
+        print(f"{workers:>3} worker(s): {elapsed:6.2f} s  (x{serial_time / elapsed:.2f})")
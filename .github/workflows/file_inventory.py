@@ -0,0 +1,85 @@
+# Files tracked by a clone, read from the git index in one `git ls-files` call
+from dataclasses import dataclass
+import os
+import subprocess
+
+# Modes of the index entries that are files (symbolic links are 120000, submodules 160000)
+REGULAR_FILE_MODES = ('100644', '100755')
+
+@dataclass
+class IndexEntry:
+    path: str  # relative to the repo, with / separators
+    mode: str
+    blob_id: str
+    checked_out: bool  # False for the files left out by a sparse checkout
+    eol_info: str = None  # 'i/<eol> w/<eol> attr/<attributes>' as printed by git ls-files --eol
+
+    def is_file(self):
+        return self.mode in REGULAR_FILE_MODES
+
+    @property
+    def name(self):
+        return self.path.rsplit('/', 1)[-1]
+
+def run_ls_files(repo_path, *args):
+    result = subprocess.run(["git", "ls-files", "-z", "-t", "-s", *args], cwd=repo_path, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"🔴 Error running 'git ls-files': {result.stderr.strip()}")
+        raise ValueError("Problem while listing the files of the index.")
+    with_eol = "--eol" in args
+    entries = []
+    for record in result.stdout.split('\0'):
+        if not record:
+            continue
+        # <tag> SP <mode> SP <object> SP <stage> TAB [<eol info> TAB] <path>, the path itself may contain tabs
+        fields = record.split('\t', 2 if with_eol else 1)
+        tag, mode, blob_id, _stage = fields[0].split(' ')
+        eol_info = fields[1] if with_eol else None
+        entries.append(IndexEntry(fields[-1], mode, blob_id, tag != 'S', eol_info))
+    return entries
+
+class FileInventory:
+    """
+    Path, mode, blob id and EOL information of the files tracked by a clone.
+
+    A full checkout is listed with a single `git ls-files -s --eol`. In a blobless sparse checkout,
+    --eol would download every blob that isn't checked out to compute its EOL, so the EOL information
+    is only read for the eol_pathspecs, with a second call made the first time it is needed.
+    """
+
+    def __init__(self, repo_path, entries, eol_pathspecs=None):
+        self.repo_path = repo_path
+        self.entries = entries
+        self.eol_pathspecs = eol_pathspecs
+        self.by_path = {entry.path: entry for entry in entries}
+
+    @classmethod
+    def load(cls, repo_path, sparse, eol_pathspecs):
+        if sparse:
+            return cls(repo_path, run_ls_files(repo_path), eol_pathspecs)
+        return cls(repo_path, run_ls_files(repo_path, "--eol"))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def files(self):
+        return [entry for entry in self.entries if entry.is_file()]
+
+    def is_empty(self):
+        return not self.entries
+
+    def has_folder(self, folder):
+        prefix = folder.rstrip('/') + '/'
+        return any(entry.path.startswith(prefix) for entry in self.entries)
+
+    def eol_entries(self):
+        """Entries of the eol_pathspecs files (every file in a full checkout), with their EOL information."""
+        if self.eol_pathspecs is not None:
+            for entry in run_ls_files(self.repo_path, "--eol", "--", *self.eol_pathspecs):
+                if entry.path in self.by_path:
+                    self.by_path[entry.path].eol_info = entry.eol_info
+            self.eol_pathspecs = None
+        return [entry for entry in self.entries if entry.eol_info is not None]
+
+    def full_path(self, entry):
+        return os.path.join(self.repo_path, *entry.path.split('/'))
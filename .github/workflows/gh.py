@@ -1,95 +1,180 @@
 # Github API utilities
 import os
-import requests
+import json
+import shutil
 import subprocess
 import re
+import fnmatch
 import utils
-import datetime
+import concurrent.futures
+import multiprocessing
+import urllib.parse
+from github_client import get_client
+from issue_snapshot import IssueSnapshot
+from file_inventory import FileInventory
 
 def get_all_issues_title(token, repo_slug):
-    url = f"https://api.github.com/repos/{repo_slug}/issues"
-    headers = {
-        'Accept': 'application/vnd.github.v3+json',
-        'Authorization': f'token {token}'
-    }
-    
-    params = {
-        'per_page': 100,  # Maximum number of issues per page
-        'state': 'all',   # Fetch all issues, open and closed
-        'page': 1         # Start with the first page
-    }
-    
-    all_issues_title = []
-    
-    while True:
-        response = requests.get(url, headers=headers, params=params)
-        
-        if response.status_code == 200:
-            issues = response.json()
-            all_issues_title.extend([issue['title'] for issue in issues])
-            
-            if len(issues) < 100:
-                # If fewer than 100 issues were returned, this is the last page
-                break
-            else:
-                # Move to the next page
-                params['page'] += 1
-        else:
-            print(f"🔴 Failed to fetch issues. Status code: {response.status_code}")
-            raise ValueError("Problem while fetching issues.")
-    
-    return all_issues_title
+    return get_issue_snapshot(token, repo_slug).titles()
+
+# Maximum number of pages fetched at the same time when listing a paginated endpoint
+MAX_PAGE_WORKERS = 4
+
+def parse_link_header(link_header):
+    """Parse a Link header into a {rel: url} dict."""
+    links = {}
+    for part in (link_header or '').split(','):
+        match = re.match(r'\s*<([^>]*)>\s*;\s*rel="([^"]*)"', part)
+        if match:
+            links[match.group(2)] = match.group(1)
+    return links
+
+def get_last_page_number(response):
+    """Return the page number of rel="last" in the Link header of the response, or None if there is none."""
+    last_url = parse_link_header(response.headers.get('Link')).get('last')
+    if not last_url:
+        return None
+    query = urllib.parse.parse_qs(urllib.parse.urlparse(last_url).query)
+    try:
+        return int(query['page'][0])
+    except (KeyError, ValueError):
+        return None
 
-#Change this function to get only the issues that match the state (all, open, closed)
-def get_all_issues(token, repo_slug, state='all'):
-    url = f"https://api.github.com/repos/{repo_slug}/issues"
-    headers = {
-        'Accept': 'application/vnd.github.v3+json',
-        'Authorization': f'token {token}'
-    }
+def get_paginated(token, path, params=None, per_page=100, what="items"):
+    """
+    Fetch every page of a paginated list endpoint and return the items in page order.
+
+    The first page is fetched alone to read rel="last" from its Link header, the remaining pages
+    are then fetched concurrently (at most MAX_PAGE_WORKERS at a time). Any page that fails raises a ValueError.
+    """
+    params = dict(params or {})
+    params['per_page'] = per_page
+
+    def fetch_page(page):
+        response = get_client(token).get(path, params=dict(params, page=page), cache=True)
+        if response.status_code != 200:
+            print(f"🔴 Failed to fetch {what} (page {page}). Status code: {response.status_code}")
+            raise ValueError(f"Problem while fetching {what}.")
+        return response
+
+    first = fetch_page(1)
+    items = list(first.json())
+    last_page = get_last_page_number(first)
+
+    if last_page is not None:
+        if last_page > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(MAX_PAGE_WORKERS, last_page - 1)) as executor:
+                for response in executor.map(fetch_page, range(2, last_page + 1)):
+                    items.extend(response.json())
+        return items
+
+    # No Link header, keep going until a page isn't full
+    page = 1
+    page_items = items
+    while len(page_items) >= per_page:
+        page += 1
+        page_items = fetch_page(page).json()
+        items.extend(page_items)
+    return items
 
+#Change this function to get only the issues that match the state (all, open, closed)
+def get_all_issues(token, repo_slug, state='all', since=None, sort=None):
     params = {
-        'per_page': 100,  # Maximum number of issues per page
         'state': state,   # Fetch issues that match the provided state
-        'page': 1         # Start with the first page
-        
     }
-    
-    all_issues_title = []
-    
-    while True:
-        response = requests.get(url, headers=headers, params=params)
-        
-        if response.status_code == 200:
-            issues = response.json()
-            all_issues_title.extend([issue for issue in issues])
-            
-            if len(issues) < 100:
-                # If fewer than 100 issues were returned, this is the last page
-                break
-            else:
-                # Move to the next page
-                params['page'] += 1
-        else:
-            print(f"🔴 Failed to fetch issues. Status code: {response.status_code}")
-            raise ValueError("Problem while fetching issues.")
-    
-    return all_issues_title
+    if since:
+        params['since'] = since  # Only issues updated at or after this time
+    if sort:
+        params['sort'] = sort
+
+    return get_paginated(token, f"/repos/{repo_slug}/issues", params, what="issues")
+
+# Snapshot of all the issues (open and closed), fetched once per run for each repo slug
+issue_snapshots = {}
+
+# Folder where snapshots are persisted between runs (restored by the Actions cache)
+ISSUE_SNAPSHOT_DIR = os.path.join('.cache', 'issues')
+
+def reset_issue_caches():
+    """Forget everything that was indexed about issues during the run."""
+    issue_snapshots.clear()
+    issues_by_number.clear()
+    issue_comments.clear()
+
+def issue_snapshot_path(repo_slug):
+    return os.path.join(ISSUE_SNAPSHOT_DIR, utils.unique_folder(*repo_slug.split('/', 1)) + '.jsonl')
+
+def get_issue_snapshot(token, repo_slug, persist=False):
+    """
+    Return the IssueSnapshot of the repo, listing its issues (state=all) on first use only.
+
+    With persist=True, the snapshot saved by the previous run is loaded and only the issues
+    updated since then are fetched (since=<last update>, sort=updated) and merged in.
+    """
+    snapshot = issue_snapshots.get(repo_slug)
+    if snapshot is not None:
+        return snapshot
+
+    path = issue_snapshot_path(repo_slug)
+    if persist:
+        try:
+            snapshot = IssueSnapshot.load(path)
+        except Exception as e:
+            print(f"🟡 Could not load the issue snapshot from {path}, doing a full sync: {e}")
+            snapshot = None
+
+    if snapshot is not None and snapshot.last_updated_at():
+        since = snapshot.last_updated_at()
+        updated_issues = get_all_issues(token, repo_slug, state='all', since=since, sort='updated')
+        for issue in updated_issues:
+            snapshot.upsert(issue)
+        print(f"Loaded {len(snapshot)} issues from {path}, {len(updated_issues)} updated since {since}")
+    else:
+        snapshot = IssueSnapshot.from_api(get_all_issues(token, repo_slug, state='all'))
+        print(f"Loaded {len(snapshot)} issues from {repo_slug}")
+
+    if persist:
+        snapshot.save(path)
+    issue_snapshots[repo_slug] = snapshot
+    return snapshot
+
+# Full issue objects as last returned by the API (reads and writes): {(repo_slug, issue_number): issue}
+issues_by_number = {}
+
+def record_issue(repo_slug, issue):
+    """
+    Write an issue returned by the API through to the run's caches: the full issue object
+    used by get_issue and the issue snapshot (if already loaded).
+    """
+    if not issue or not issue.get('number'):
+        return
+    issues_by_number[(repo_slug, int(issue['number']))] = issue
+    snapshot = issue_snapshots.get(repo_slug)
+    if snapshot is not None:
+        snapshot.upsert(issue)
+
+def record_issue_labels(repo_slug, issue_number, labels):
+    """Update the cached labels of an issue from the label list returned by the labels endpoints."""
+    issue = issues_by_number.get((repo_slug, int(issue_number)))
+    if issue is not None:
+        issue['labels'] = labels
+    snapshot = issue_snapshots.get(repo_slug)
+    record = snapshot.get(int(issue_number)) if snapshot is not None else None
+    if record is not None:
+        record.labels = [label['name'] if isinstance(label, dict) else label for label in labels]
 
 def has_closed_issue_with_exact_title(token, repo_slug, issue_title):
     """Check if there is already a closed issue with exactly the same title."""
     try:
-        closed_issues = get_all_issues(token, repo_slug, state='closed')
-
-        for issue in closed_issues:
-            if issue.get('title') == issue_title:
-                closed_at_str = issue.get('closed_at')
-                issue_number = issue.get('number')
-                if closed_at_str:
-                    print(f"🔴 Found closed issue '{issue_title}' (issue #{issue_number}, closed at {closed_at_str})")
-                else:
-                    print(f"🔴 Found closed issue '{issue_title}' (issue #{issue_number})")
-                return True
+        issue = get_issue_snapshot(token, repo_slug).find_closed_by_title(issue_title)
+
+        if issue is not None:
+            closed_at_str = issue.closed_at
+            issue_number = issue.number
+            if closed_at_str:
+                print(f"🔴 Found closed issue '{issue_title}' (issue #{issue_number}, closed at {closed_at_str})")
+            else:
+                print(f"🔴 Found closed issue '{issue_title}' (issue #{issue_number})")
+            return True
 
         return False
 
@@ -98,26 +183,22 @@ def has_closed_issue_with_exact_title(token, repo_slug, issue_title):
         raise Exception(f"Failed to check for matching closed issues: {e}")  # Throw to stop issue creation and move to next repo
 
 def get_issue(token, repo_slug , issue_number):
-    url = f"https://api.github.com/repos/{repo_slug}/issues/{issue_number}"
-    headers = {
-        'Accept': 'application/vnd.github.v3+json',
-        'Authorization': f'token {token}'
-    }
-    
-    response = requests.get(url, headers=headers)
+    # Issues read or written earlier in the run are answered without a request
+    issue = issues_by_number.get((repo_slug, int(issue_number)))
+    if issue is not None:
+        return issue
+
+    response = get_client(token).get(f"/repos/{repo_slug}/issues/{issue_number}", cache=True)
     
     if response.status_code == 200:
-        return response.json()
+        issue = response.json()
+        record_issue(repo_slug, issue)
+        return issue
     else:
         print(f"Failed to fetch issue {issue_number}. Status code: {response.status_code}")
 
 def create_github_issue(token, this_repo_slug, title, body, labels=None):
-    url = f"https://api.github.com/repos/{this_repo_slug}/issues"
-    headers = {
-        'Accept': 'application/vnd.github.v3+json',
-        'Authorization': f'token {token}',
-        'Content-Type': 'application/json; charset=utf-8'
-    }
+    url = f"/repos/{this_repo_slug}/issues"
     data = {
         'title': title,
         'body': body,
@@ -125,13 +206,13 @@ def create_github_issue(token, this_repo_slug, title, body, labels=None):
     }
     
     print(f"URL: {url}")
-    print(f"Headers: {headers}")
     print(f"Data: {data}")
 
-    response = requests.post(url, headers=headers, json=data)
+    response = get_client(token).post(url, json=data)
     
     if response.status_code == 201:
         print(f"🟢 Issue created successfully: {response.json()['html_url']}")
+        record_issue(this_repo_slug, response.json())
         return response.json()['number']
     else:
         print(f"🔴 Failed to create issue. Status code: {response.status_code}")
@@ -139,80 +220,125 @@ def create_github_issue(token, this_repo_slug, title, body, labels=None):
 
 # Once during the existence of the repo, we need to create a new issue that stores the information about the repo we've scanned in the last week
 # Can call create_github_issue and pass it hardcoded values that are unique to that issue
-def create_github_issue_for_scanned_repo(token, this_repo_slug):
-    title = "Scanning cache"
-    body = "This issue is used to store the information about the repo we've scanned in the last week"
-    create_github_issue(token, this_repo_slug, title, body)
-
-def get_issue_for_scanned_repo(token, this_repo_slug):
-    # Get all issues for the repo
-    all_issues = get_all_issues(token, this_repo_slug)
-    
-    # Iterate through all issues and check if the title matches
-    for issue in all_issues:
-        if issue['title'] == "Scanning cache":
-            return issue
-    
-    # If no matching issue is found, return None
-    return None
-
-def update_issue(token, this_repo_slug, issue_number, body):
-    url = f"https://api.github.com/repos/{this_repo_slug}/issues/{issue_number}"
-    headers = {
-        'Accept': 'application/vnd.github.v3+json',
-        'Authorization': f'token {token}'
-    }
+def update_issue(token, this_repo_slug, issue_number, body, title=None):
     data = {
         'body': body
     }
-    response = requests.patch(url, headers=headers, json=data)
+    if title is not None:
+        data['title'] = title
+    response = get_client(token).patch(f"/repos/{this_repo_slug}/issues/{issue_number}", json=data)
     if response.status_code == 200:
         print(f"🟢 Issue updated successfully: {response.json()['html_url']}")
+        record_issue(this_repo_slug, response.json())
+        return response.json()
     else:
         print(f"🔴 Failed to update issue. Status code: {response.status_code}")
         print(response.json())
+        return None
+
+# Maximum number of characters GitHub accepts in an issue body
+MAX_ISSUE_BODY_LENGTH = 65536
 
-def append_to_issue_body_if_missing(token, repo_slug, issue_number, content):
-    if get_issue_body(token, repo_slug, issue_number).find(content) == -1:
-        append_to_issue_body(token, repo_slug, issue_number, content)
+# Lines waiting to be appended to tracking issues, flushed once at the end of the run: {(repo_slug, issue_number): [content, ...]}
+pending_issue_appends = {}
 
-def append_to_issue_body(token, repo_slug, issue_number, content):
-    current_body = get_issue_body(token, repo_slug, issue_number)
-    print(f"ℹ️ Issue #{issue_number} body size before append: {len(current_body)}/65536 characters")
-    new_body = current_body + content
-    update_issue(token, repo_slug, issue_number, new_body)
+def queue_issue_body_append(repo_slug, issue_number, content):
+    """Buffer a line to append to a tracking issue, see flush_issue_body_appends."""
+    pending = pending_issue_appends.setdefault((repo_slug, int(issue_number)), [])
+    if content not in pending:
+        pending.append(content)
 
-def get_issue_body(token, repo_slug, issue_number):
-    return get_issue(token, repo_slug, issue_number)['body']
+def flush_issue_body_appends(token):
+    """
+    Append all the buffered lines, with a single body fetch and a single PATCH per tracking issue.
+    The lines of an issue that couldn't be updated stay queued for the next flush.
+    """
+    for (repo_slug, issue_number), contents in list(pending_issue_appends.items()):
+        try:
+            append_lines_to_issue_body(token, repo_slug, issue_number, contents)
+            del pending_issue_appends[(repo_slug, issue_number)]
+        except Exception as e:
+            print(f"🔴 Error while appending to issue #{issue_number}, {len(contents)} lines kept for the next flush: {e}")
+
+def continuation_title(title, part):
+    return f"{title} (part {part})"
+
+def get_issue_chain(token, repo_slug, issue_number):
+    """
+    Return the tracking issue followed by its continuation issues (opened when the body got too long).
+    Continuations are found in the issue snapshot by their title: "<title> (part 2)", "<title> (part 3)", ...
+    """
+    chain = [get_issue(token, repo_slug, issue_number)]
+    snapshot = get_issue_snapshot(token, repo_slug)
+    titles = {record.title: record.number for record in snapshot.records.values()}
+    part = 2
+    while continuation_title(chain[0]['title'], part) in titles:
+        chain.append(get_issue(token, repo_slug, titles[continuation_title(chain[0]['title'], part)]))
+        part += 1
+    return chain
+
+def append_lines_to_issue_body(token, repo_slug, issue_number, contents):
+    """
+    Append the lines that aren't already in the tracking issue (or one of its continuations) with a single PATCH.
+    When the body would go over MAX_ISSUE_BODY_LENGTH, the rest goes to a new continuation issue.
+    """
+    chain = get_issue_chain(token, repo_slug, issue_number)
+    existing_bodies = [issue.get('body') or '' for issue in chain]
+    missing = []
+    for content in contents:
+        if content not in missing and all(body.find(content) == -1 for body in existing_bodies):
+            missing.append(content)
+    if not missing:
+        return
+
+    original = chain[0]
+    target = chain[-1]
+    body = target.get('body') or ''
+    print(f"ℹ️ Issue #{target['number']} body size before append: {len(body)}/{MAX_ISSUE_BODY_LENGTH} characters")
+
+    for content in missing:
+        if len(body) + len(content) > MAX_ISSUE_BODY_LENGTH:
+            if body != (target.get('body') or '') and update_issue(token, repo_slug, target['number'], body) is None:
+                raise ValueError(f"Problem while updating the body of issue #{target['number']}.")
+            title = continuation_title(original['title'], len(chain) + 1)
+            print(f"🟡 Issue #{target['number']} is full, continuing in a new issue: {title}")
+            labels = [label['name'] if isinstance(label, dict) else label for label in original.get('labels', [])]
+            new_number = create_github_issue(token, repo_slug, title, f"Continuation of #{original['number']}.\n\n", labels)
+            if not new_number:
+                raise ValueError(f"Could not create a continuation issue for #{original['number']}.")
+            target = get_issue(token, repo_slug, new_number)
+            chain.append(target)
+            body = target.get('body') or ''
+        body += content
+
+    if update_issue(token, repo_slug, target['number'], body) is None:
+        raise ValueError(f"Problem while updating the body of issue #{target['number']}.")
+
+# Comment bodies of each issue, fetched once per run: {(repo_slug, issue_number): [body, ...]}
+issue_comments = {}
+
+def get_issue_comments(token, repo_slug, issue_number):
+    """Return the bodies of all the comments of an issue, listing them (every page) on first use only."""
+    key = (repo_slug, int(issue_number))
+    comments = issue_comments.get(key)
+    if comments is None:
+        comments = [comment.get('body') or '' for comment in get_paginated(token, f"/repos/{repo_slug}/issues/{issue_number}/comments", what="comments")]
+        issue_comments[key] = comments
+    return comments
 
 # Check if the issue already has a comment containing the provided substring
 def already_commented(token, repo_slug, issue_number, sub_string):
-    url = f"https://api.github.com/repos/{repo_slug}/issues/{issue_number}/comments"
-    headers = {
-        'Accept': 'application/vnd.github.v3+json',
-        'Authorization': f'token {token}'
-    }
-    response = requests.get(url, headers=headers)
-    
-    if response.status_code == 200:
-        comments = response.json()
-        for comment in comments:
-            if sub_string in comment['body']:
-                return True
-    else:
-        print(f"Failed to fetch comments for issue {issue_number}. Status code: {response.status_code}")
-        raise ValueError("Problem while fetching comments.")
-    
-    return False
+    try:
+        comments = get_issue_comments(token, repo_slug, issue_number)
+    except ValueError:
+        print(f"Failed to fetch comments for issue {issue_number}.")
+        raise
+
+    return any(sub_string in body for body in comments)
 
 def get_comment(token, repo_slug, comment_id):
     """Get a specific comment by its ID"""
-    url = f"https://api.github.com/repos/{repo_slug}/issues/comments/{comment_id}"
-    headers = {
-        'Accept': 'application/vnd.github.v3+json',
-        'Authorization': f'token {token}'
-    }
-    response = requests.get(url, headers=headers)
+    response = get_client(token).get(f"/repos/{repo_slug}/issues/comments/{comment_id}", cache=True)
     
     if response.status_code == 200:
         return response.json()
@@ -226,19 +352,17 @@ def create_comment(token, repo_slug, issue_number, body):
         print(f"🔴 Failed to create comment: issue_number is required")
         return None
         
-    url = f"https://api.github.com/repos/{repo_slug}/issues/{issue_number}/comments"
-    headers = {
-        'Accept': 'application/vnd.github.v3+json',
-        'Authorization': f'token {token}'
-    }
     data = {
         'body': body
     }
     
-    response = requests.post(url, headers=headers, json=data)
+    response = get_client(token).post(f"/repos/{repo_slug}/issues/{issue_number}/comments", json=data)
     
     if response.status_code == 201:
         print(f"🟢 Comment created successfully on issue {issue_number}")
+        comments = issue_comments.get((repo_slug, int(issue_number)))
+        if comments is not None:
+            comments.append(response.json().get('body') or body)
         return response.json()
     else:
         print(f"🔴 Failed to create comment on issue {issue_number}. Status code: {response.status_code}")
@@ -257,32 +381,23 @@ def write_comment(token, repo_slug, issue, comment):
     return create_comment(token, repo_slug, issue_number, comment)
 
 def add_label_to_issue(token, repo_slug, issue_number, label):
-    url = f"https://api.github.com/repos/{repo_slug}/issues/{issue_number}/labels"
-    headers = {
-        'Accept': 'application/vnd.github.v3+json',
-        'Authorization': f'token {token}'
-    }
     data = [label]
     
-    response = requests.post(url, headers=headers, json=data)
+    response = get_client(token).post(f"/repos/{repo_slug}/issues/{issue_number}/labels", json=data)
     
     if response.status_code == 200:
         print(f"🟢 Label '{label}' added to issue {issue_number} successfully")
+        record_issue_labels(repo_slug, issue_number, response.json())
     else:
         print(f"🔴 Failed to add label to issue {issue_number}. Status code: {response.status_code}")
         print(response.json())
 
 def remove_label_from_issue(token, repo_slug, issue_number, label, ignore_not_found=False):
-    url = f"https://api.github.com/repos/{repo_slug}/issues/{issue_number}/labels/{label}"
-    headers = {
-        'Accept': 'application/vnd.github.v3+json',
-        'Authorization': f'token {token}'
-    }
-    
-    response = requests.delete(url, headers=headers)
+    response = get_client(token).delete(f"/repos/{repo_slug}/issues/{issue_number}/labels/{label}")
     
     if response.status_code == 200:
         print(f"🟢 Label '{label}' removed from issue {issue_number} successfully")
+        record_issue_labels(repo_slug, issue_number, response.json())
     else:
         if response.status_code == 404 and ignore_not_found:
             print(f"⚪ Label '{label}' not found on issue {issue_number}, ignoring as per settings.")
@@ -295,101 +410,565 @@ def close_issue(token, repo_slug, issue, reason):
     issue_number = issue['number']
     
     if issue_number:
-        url = f"https://api.github.com/repos/{repo_slug}/issues/{issue_number}"
-        headers = {
-            'Accept': 'application/vnd.github.v3+json',
-            'Authorization': f'token {token}'
-        }
         data = {
             'state': 'closed',
             'state_reason': reason
         }
         
-        response = requests.patch(url, headers=headers, json=data)
+        response = get_client(token).patch(f"/repos/{repo_slug}/issues/{issue_number}", json=data)
         
         if response.status_code == 200:
             print(f"🟢 Issue {issue_number} closed successfully")
+            record_issue(repo_slug, response.json())
         else:
             print(f"🔴 Failed to close issue {issue_number}. Status code: {response.status_code}")
             print(response.json())
     else:
         print(f"Failed to get issue number for issue: {issue['title']}")
 
-def clone_repo(repo_url):
+# Files materialised by the sparse checkout (non-cone patterns, the last matching pattern wins):
+# every extensionless file, the source files read by the checks and the .gitattributes files.
+# VBA-enabled Office documents are left out, they are counted from the index instead.
+SPARSE_CHECKOUT_PATTERNS = ['*', '!*.*', '.gitattributes'] + ['*' + ext for ext in utils.code_extensions + utils.config_extensions if ext.startswith('.')]
+
+def clone_repo(repo_url, sparse=True):
 
     if repo_url == "":
         print("🔴 Repo URL was empty")
         raise ValueError("URL can't be empty.")
 
-    if not os.path.exists(utils.subfolder_name()):
-        os.makedirs(utils.subfolder_name())
+    # Clones can run concurrently (see clone_pool.py)
+    os.makedirs(utils.subfolder_name(), exist_ok=True)
     
     repo_slug =  utils.unique_folder(repo_url.split('/')[-2], repo_url.split('/')[-1])
     repo_path = os.path.join(utils.subfolder_name(), repo_slug)
     
+    # Clones are kept between runs (restored by the Actions cache), an existing one is brought up to date instead
+    if os.path.exists(repo_path):
+        if update_repo(repo_url, repo_path):
+            return True
+        print(f"🟡 {repo_path} is not a usable clone anymore, cloning again.")
+        shutil.rmtree(repo_path)
+
     if not os.path.exists(repo_path):
         print(f"Cloning {repo_url} into {repo_path}")
-        result = subprocess.run(["git", "clone", "--depth", "1", "--quiet", repo_url, repo_path])
+        if not sparse:
+            result = subprocess.run(["git", "clone", "--depth", "1", "--quiet", repo_url, repo_path])
+            if result.returncode != 0:
+                print(f"🔴 Failed to clone repository {repo_url}. Exit code: {result.returncode}")
+                raise ValueError(f"Git clone failed with exit code {result.returncode}")
+            return True
+
+        # Blobless clone: only the commit and its trees are downloaded, blobs are fetched on checkout
+        result = subprocess.run(["git", "clone", "--depth", "1", "--filter=blob:none", "--no-checkout", "--quiet", repo_url, repo_path])
         if result.returncode != 0:
             print(f"🔴 Failed to clone repository {repo_url}. Exit code: {result.returncode}")
             raise ValueError(f"Git clone failed with exit code {result.returncode}")
+
+        result = subprocess.run(["git", "sparse-checkout", "set", "--no-cone", *SPARSE_CHECKOUT_PATTERNS], cwd=repo_path)
+        if result.returncode != 0:
+            print(f"🔴 Failed to set up the sparse checkout of {repo_url}. Exit code: {result.returncode}")
+            raise ValueError(f"Git sparse-checkout failed with exit code {result.returncode}")
+
+        # An empty repository has nothing to check out
+        if subprocess.run(["git", "rev-parse", "--verify", "--quiet", "HEAD"], cwd=repo_path, capture_output=True).returncode == 0:
+            result = subprocess.run(["git", "checkout", "--quiet"], cwd=repo_path)
+            if result.returncode != 0:
+                print(f"🔴 Failed to check out repository {repo_url}. Exit code: {result.returncode}")
+                raise ValueError(f"Git checkout failed with exit code {result.returncode}")
         return True
-    else:
-        print(f"Repository {repo_slug} already exists in {utils.subfolder_name()}.")
-        raise ValueError("Problem with cloning.")
-    
-def count_vba_related_files(repo_path):
 
+def get_remote_head(repo_url):
+    """Return the SHA that HEAD points to on the remote, or None for an empty repository."""
+    result = subprocess.run(["git", "ls-remote", repo_url, "HEAD"], capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"🔴 Failed to query the HEAD of {repo_url}. Exit code: {result.returncode}")
+        raise ValueError(f"Git ls-remote failed with exit code {result.returncode}")
+    output = result.stdout.split()
+    return output[0] if output else None
+
+# HEAD of the remotes already resolved during the run (GraphQL defaultBranchRef or ls-remote): {repo_url: sha}
+remote_heads = {}
+
+def get_head_sha(repo_path):
+    result = subprocess.run(["git", "rev-parse", "--verify", "--quiet", "HEAD"], cwd=repo_path, capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+def update_repo(repo_url, repo_path):
+    """
+    Bring an existing clone to the current HEAD of the remote.
+    The fetch is skipped when HEAD did not move, as known from remote_heads or else from 'git ls-remote'.
+    Returns False when repo_path is not a usable clone.
+    """
+    if not os.path.isdir(os.path.join(repo_path, '.git')):
+        return False
+
+    remote_sha = remote_heads.get(repo_url) or get_remote_head(repo_url)
+    if remote_sha == get_head_sha(repo_path):
+        print(f"🟢 {repo_path} is already at {remote_sha}, no fetch needed.")
+        return True
+
+    print(f"Updating {repo_path} to {remote_sha}")
+    # A blobless clone keeps its filter for the fetch (remote.origin.partialclonefilter)
+    result = subprocess.run(["git", "fetch", "--depth", "1", "--quiet", "origin", "HEAD"], cwd=repo_path)
+    if result.returncode != 0:
+        print(f"🔴 Failed to fetch repository {repo_url}. Exit code: {result.returncode}")
+        raise ValueError(f"Git fetch failed with exit code {result.returncode}")
+
+    # The sparse checkout patterns still apply
+    result = subprocess.run(["git", "reset", "--hard", "--quiet", "FETCH_HEAD"], cwd=repo_path)
+    return result.returncode == 0
+
+def is_sparse_checkout(repo_path):
+    result = subprocess.run(["git", "config", "--bool", "core.sparseCheckout"], cwd=repo_path, capture_output=True, text=True)
+    return result.stdout.strip() == "true"
+
+# Inventory of the last clone looked at, reused as long as its index doesn't change
+inventory_cache = {}
+
+def get_file_inventory(repo_path):
+    """
+    FileInventory of the files tracked by the clone, read once and shared by the counts,
+    the emptiness and xvba_modules checks and the EOL checks.
+    """
+    try:
+        stat = os.stat(os.path.join(repo_path, '.git', 'index'))
+        key = (os.path.abspath(repo_path), stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        # No index yet: nothing was ever checked out
+        key = (os.path.abspath(repo_path), None, None)
+    inventory = inventory_cache.get(key)
+    if inventory is None:
+        inventory = FileInventory.load(repo_path, is_sparse_checkout(repo_path), EOL_PATHSPECS)
+        inventory_cache.clear()
+        inventory_cache[key] = inventory
+    return inventory
+
+def get_lfs_paths(repo_path, paths):
+    """Return the subset of paths stored with Git LFS (the repo only contains a text pointer for those)."""
+    if not paths:
+        return set()
+    result = subprocess.run(["git", "check-attr", "--stdin", "-z", "filter"], cwd=repo_path, input='\0'.join(paths) + '\0', capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"🔴 Error running 'git check-attr': {result.stderr.strip()}")
+        return set()
+    # Output is a sequence of <path> NUL <attribute> NUL <value> NUL
+    fields = result.stdout.split('\0')
+    return {fields[i] for i in range(0, len(fields) - 2, 3) if fields[i + 2] == 'lfs'}
+
+# Verdicts of the file classifiers keyed by blob id (a BlobMemo), set by the scripts that persist it
+blob_memo = None
+
+# Attributes that make the checked out file differ from its blob (the default core.autocrlf=false is assumed)
+CHECKOUT_CONVERSION_ATTRIBUTES = ['eol', 'filter', 'ident', 'working-tree-encoding']
+
+def get_blob_ids(repo_path, paths):
+    """
+    Return the blob id in the index of each of the given paths (relative, with / separators).
+    Paths whose checkout converts the content (eol=crlf, filters...) are left out: the file on disk
+    isn't the blob, so a verdict computed from it can't be shared with other checkouts of the blob.
+    """
+    if not paths:
+        return {}
+    by_path = get_file_inventory(repo_path).by_path
+    blob_ids = {path: by_path[path].blob_id for path in paths if path in by_path}
+    if not blob_ids:
+        return {}
+
+    result = subprocess.run(["git", "check-attr", "--stdin", "-z", *CHECKOUT_CONVERSION_ATTRIBUTES], cwd=repo_path,
+                            input='\0'.join(blob_ids) + '\0', capture_output=True, text=True)
+    if result.returncode != 0:
+        return {}
+    # Output is a sequence of <path> NUL <attribute> NUL <value> NUL
+    fields = result.stdout.split('\0')
+    for i in range(0, len(fields) - 2, 3):
+        path, attribute, value = fields[i:i + 3]
+        if attribute == 'eol' and value != 'crlf':
+            continue
+        if value not in ('unspecified', 'unset'):
+            blob_ids.pop(path, None)
+    return blob_ids
+
+def memoized_verdict(blob_id, verdict, compute):
+    """compute() answered from the blob memo when there is one and the blob id of the file is known."""
+    if blob_memo is None or blob_id is None:
+        return compute()
+    return blob_memo.verdict(blob_id, verdict, compute)
+
+# Counts of the last analysis, kept inside the clone and reused while HEAD doesn't move
+COUNTS_CACHE_FILE = 'vba-checks-counts.json'
+COUNTS_CACHE_VERSION = 1
+
+def get_vba_related_file_counts(repo_path):
+    """count_vba_related_files, answered from the previous run when the clone is still at the same commit."""
+    sha = get_head_sha(repo_path)
+    cache_path = os.path.join(repo_path, '.git', COUNTS_CACHE_FILE)
+
+    if sha and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as file:
+                cached = json.load(file)
+            if cached.get('version') == COUNTS_CACHE_VERSION and cached.get('sha') == sha:
+                print(f"ℹ️ Reusing the file counts of {sha}")
+                for ext, count in cached['counts'].items():
+                    if count > 0:
+                        print(f"Number of '{ext}' files: {count}")
+                return cached['counts']
+        except (OSError, ValueError, KeyError) as e:
+            print(f"🟡 Ignoring the cached file counts: {e}")
+
+    counts = count_vba_related_files(repo_path)
+    if sha:
+        with open(cache_path, 'w', encoding='utf-8') as file:
+            json.dump({'version': COUNTS_CACHE_VERSION, 'sha': sha, 'counts': counts}, file)
+    return counts
+
+def get_vba_extensions():
     vba_extensions = []
     vba_extensions.extend(utils.code_extensions)
     vba_extensions.extend(utils.config_extensions)
     vba_extensions.extend(utils.office_vba_extensions)
+    return vba_extensions
+
+# Content probe needed before a file is counted under an extension: None (the name is enough),
+# 'vba' (the file must contain VBA code) or 'binary' (the file must be binary)
+EXTENSION_PROBES = {ext: None for ext in utils.code_extensions + utils.config_extensions if ext.count('.') == 1}
+EXTENSION_PROBES.update({'.txt': 'vba', '.vbs': 'vba'})
+EXTENSION_PROBES.update({ext: 'binary' for ext in utils.office_vba_extensions})
+
+# Compound extensions (.d.vb) are counted on top of their last component (.vb)
+COMPOUND_EXTENSIONS = {}
+for compound_ext in utils.code_extensions + utils.config_extensions:
+    if compound_ext.count('.') > 1:
+        COMPOUND_EXTENSIONS.setdefault('.' + compound_ext.rsplit('.', 1)[1], []).append(compound_ext)
+
+def match_extensions(file):
+    """Return the extensions of the counts matched by a file name and the content probe they need."""
+    if file.endswith('No ext'):
+        return ['No ext'], None
+    _, dot, suffix = file.rpartition('.')
+    if not dot:
+        return ['No ext'], 'vba'
+    ext = '.' + suffix
+    if ext not in EXTENSION_PROBES:
+        return [], None
+    return [ext] + [compound for compound in COMPOUND_EXTENSIONS.get(ext, ()) if file.endswith(compound)], EXTENSION_PROBES[ext]
+
+def count_file(counts, file, has_vba, is_binary):
+    """
+    Add a file to the counts of the extensions it matches.
+    has_vba and is_binary are only called when the content of the file is needed.
+    """
+    extensions, probe = match_extensions(file)
+    if not extensions:
+        return
+    if probe == 'vba' and not has_vba():
+        return
+    if probe == 'binary' and not is_binary():
+        return
+    for ext in extensions:
+        counts[ext] += 1
+
+# Above this many files to probe (the name alone isn't enough), the probes are spread over worker processes
+PARALLEL_COUNT_THRESHOLD = int(os.getenv('PARALLEL_COUNT_THRESHOLD', '5000'))
+COUNT_WORKERS = int(os.getenv('COUNT_WORKERS', str(os.cpu_count() or 1)))
+COUNT_BATCH_SIZE = 500
+
+def probe_file(file_path):
+    """Content probe required by the name of the file: contains VBA code, or is binary."""
+    _, probe = match_extensions(os.path.basename(file_path))
+    if probe == 'binary':
+        return utils.is_binary_file(file_path)
+    return is_vba_file(file_path)
+
+def probe_files(file_paths):
+    """Verdicts of a batch of working tree files (runs in a worker process in parallel mode)."""
+    return [probe_file(file_path) for file_path in file_paths]
+
+def get_worker_context():
+    """
+    Start the worker processes from a fresh interpreter instead of forking this one: the clone pool and
+    pagination threads may hold locks (HTTP connection pools, stdout) that a forked child would inherit locked.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+def probe_files_in_parallel(file_paths, workers):
+    """Same result as probe_files(file_paths), with the batches classified by a pool of processes."""
+    batches = [file_paths[i:i + COUNT_BATCH_SIZE] for i in range(0, len(file_paths), COUNT_BATCH_SIZE)]
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=get_worker_context()) as executor:
+            batch_verdicts = list(executor.map(probe_files, batches))
+    except (OSError, NotImplementedError, concurrent.futures.BrokenExecutor) as e:
+        # Some runners can't start processes, the probes are mostly I/O so threads still help
+        print(f"🟡 Process pool unavailable ({e}), classifying with threads instead")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            batch_verdicts = list(executor.map(probe_files, batches))
+    return [verdict for batch in batch_verdicts for verdict in batch]
+
+def count_vba_related_files(repo_path, workers=None, threshold=None):
+
+    counts = {ext: 0 for ext in get_vba_extensions()}
+    workers = COUNT_WORKERS if workers is None else workers
+    threshold = PARALLEL_COUNT_THRESHOLD if threshold is None else threshold
+
+    # Only the files tracked by git are counted. Files matched by name are counted right away,
+    # the ones that need a content probe are set aside.
+    inventory = get_file_inventory(repo_path)
+    probed_entries = []
+    office_entries = []
+    for entry in inventory.files():
+        extensions, probe = match_extensions(entry.name)
+        if not extensions:
+            continue
+        if probe is None:
+            count_file(counts, entry.name, None, None)
+        elif entry.checked_out:
+            probed_entries.append(entry)
+        elif probe == 'binary':
+            office_entries.append(entry)
+
+    # Blobs classified in a previous repo or run are answered by the memo
+    verdicts = {}
+    blob_ids = {}
+    if blob_memo is not None and probed_entries:
+        blob_ids = get_blob_ids(repo_path, [entry.path for entry in probed_entries])
+        for entry in probed_entries:
+            if entry.path in blob_ids:
+                verdict = blob_memo.get(blob_ids[entry.path], match_extensions(entry.name)[1])
+                if verdict is not None:
+                    verdicts[entry.path] = verdict
+        if verdicts:
+            print(f"ℹ️ {len(verdicts)} of {len(probed_entries)} files classified from the blob memo")
+
+    unknown_entries = [entry for entry in probed_entries if entry.path not in verdicts]
+    unknown_paths = [inventory.full_path(entry) for entry in unknown_entries]
+    if workers > 1 and len(unknown_paths) > threshold:
+        print(f"ℹ️ Classifying {len(unknown_paths)} files with {workers} worker processes")
+        unknown_verdicts = probe_files_in_parallel(unknown_paths, workers)
+    else:
+        unknown_verdicts = probe_files(unknown_paths)
+    for entry, verdict in zip(unknown_entries, unknown_verdicts):
+        verdicts[entry.path] = verdict
+        if entry.path in blob_ids:
+            blob_memo.set(blob_ids[entry.path], match_extensions(entry.name)[1], verdict)
+
+    for entry in probed_entries:
+        count_file(counts, entry.name, lambda: verdicts[entry.path], lambda: verdicts[entry.path])
+
+    # Office documents are not checked out by the sparse clone, they are counted from the index.
+    # They are zip (or OLE) containers and therefore binary, unless the repo only holds an LFS pointer.
+    lfs_paths = get_lfs_paths(repo_path, [entry.path for entry in office_entries])
+    for entry in office_entries:
+        if entry.path not in lfs_paths:
+            count_file(counts, entry.name, None, lambda: True)
+
+    # Print the counts
+    for ext, count in counts.items():
+        if count > 0:
+            print(f"Number of '{ext}' files: {count}")
     
-    counts = {ext: 0 for ext in vba_extensions}
-    
-    for root, dirs, files in os.walk(repo_path):
-        # Remove the '.git' directory from the list of directories to avoid descending into it
-        dirs[:] = [d for d in dirs if d != '.git']
-        for file in files:
+    return counts
+
+# Files are scanned for VBA code in chunks of this size, up to the cap (data dumps and logs can be huge).
+# The cap is the same for the files of a clone and for the blobs read through the API, so both backends agree.
+VBA_PROBE_CHUNK_BYTES = 64 * 1024
+VBA_PROBE_MAX_BYTES = 1024 * 1024
 
-            file_path = os.path.join(root, file)
+# Clone-free backend: the file list comes from the Git Trees API and only the head of the
+# .txt/.vbs/extensionless files is downloaded to look for VBA code
+
+# Each probed blob costs one API request, a repo needing more than this is cloned instead
+TREE_PROBE_LIMIT = 50
+
+def get_repo_tree(token, repo_slug, ref):
+    """
+    Return the entries of the recursive tree of ref (path, type, size, sha), an empty list for an empty repo,
+    or None when GitHub truncated the listing and the repo has to be cloned instead.
+    """
+    response = get_client(token).get(f"/repos/{repo_slug}/git/trees/{ref}", params={'recursive': 1}, cache=True)
+
+    if response.status_code == 409:
+        # Git Repository is empty
+        return []
+    if response.status_code != 200:
+        print(f"🔴 Failed to fetch the tree of {repo_slug}. Status code: {response.status_code}")
+        raise ValueError("Problem while fetching the repository tree.")
+
+    tree = response.json()
+    if tree.get('truncated'):
+        print(f"🟡 The tree of {repo_slug} is too large for the API.")
+        return None
+    return tree['tree']
 
-            # Skip symbolic links
-            if os.path.islink(file_path):
+def iter_blob_chunks(token, repo_slug, sha, max_bytes=VBA_PROBE_MAX_BYTES, chunk_size=VBA_PROBE_CHUNK_BYTES):
+    """
+    Yield the first max_bytes of a blob in chunks. The body is streamed and the download stops at the cap,
+    even if the server ignores the Range header and sends the whole blob.
+    """
+    headers = {'Accept': 'application/vnd.github.raw', 'Range': f"bytes=0-{max_bytes - 1}"}
+    response = get_client(token).get(f"/repos/{repo_slug}/git/blobs/{sha}", headers=headers, stream=True)
+    try:
+        if response.status_code not in (200, 206):
+            print(f"🔴 Failed to fetch blob {sha} of {repo_slug}. Status code: {response.status_code}")
+            raise ValueError("Problem while fetching blob.")
+        remaining = max_bytes
+        for chunk in response.iter_content(chunk_size):
+            yield chunk[:remaining]
+            remaining -= len(chunk)
+            if remaining <= 0:
+                break
+    finally:
+        response.close()
+
+def blob_has_vba_code(token, repo_slug, sha):
+    """is_vba_file for a blob read through the API (the download stops at the first match)."""
+    chunks = iter_blob_chunks(token, repo_slug, sha)
+    try:
+        return has_vba_code_in_chunks(chunks)
+    finally:
+        chunks.close()
+
+def gitattributes_pattern_matches(pattern, path):
+    """
+    Whether a .gitattributes pattern matches a path relative to the folder of the .gitattributes file.
+    A pattern without a slash matches the file name at any depth, otherwise the whole path is matched
+    ('*' stays within a folder and '**' spans folders).
+    """
+    if '/' not in pattern:
+        return fnmatch.fnmatchcase(path.rsplit('/', 1)[-1], pattern)
+    regex = ''
+    parts = re.split(r'(\*\*/|/\*\*|\*|\?)', pattern.lstrip('/'))
+    for part in parts:
+        if part == '**/':
+            regex += '(?:.*/)?'
+        elif part == '/**':
+            regex += '/.*'
+        elif part == '*':
+            regex += '[^/]*'
+        elif part == '?':
+            regex += '[^/]'
+        else:
+            regex += re.escape(part)
+    return re.fullmatch(regex, path) is not None
+
+def get_tree_lfs_paths(token, repo_slug, tree, paths):
+    """
+    Same as get_lfs_paths for the paths of a tree returned by get_repo_tree: the filter attribute is
+    evaluated from the .gitattributes files of the tree (deeper files and later lines take precedence).
+    """
+    if not paths:
+        return set()
+    attributes_files = [entry for entry in tree if entry['type'] == 'blob' and entry['path'].rsplit('/', 1)[-1] == '.gitattributes']
+    attributes_files.sort(key=lambda entry: entry['path'].count('/'))
+
+    rules = []
+    for entry in attributes_files:
+        folder = entry['path'].rsplit('/', 1)[0] + '/' if '/' in entry['path'] else ''
+        content = b''.join(iter_blob_chunks(token, repo_slug, entry['sha'])).decode('utf-8', errors='ignore')
+        for line in content.splitlines():
+            fields = line.split()
+            if not fields or fields[0].startswith('#'):
                 continue
-            
-            for ext in vba_extensions:
-                if ext == ".txt" or ext == ".vbs":
-                    if file.endswith(ext) and is_vba_file(file_path):
-                        counts[ext] += 1
-                    continue
-                if ext in utils.office_vba_extensions:
-                    if file.endswith(ext) and utils.is_binary_file(file_path):
-                        counts[ext] += 1
-                    continue
-                if file.endswith(ext):
-                    counts[ext] += 1
-                    continue
-                if ext == 'No ext' and '.' not in file:
-                    if is_vba_file(file_path):
-                        counts[ext] += 1
-                    continue
+            for attribute in fields[1:]:
+                if attribute.startswith('filter='):
+                    rules.append((folder, fields[0], attribute.split('=', 1)[1]))
+                elif attribute in ('-filter', '!filter'):
+                    rules.append((folder, fields[0], None))
+
+    lfs_paths = set()
+    for path in paths:
+        value = None
+        for folder, pattern, rule_value in rules:
+            if path.startswith(folder) and gitattributes_pattern_matches(pattern, path[len(folder):]):
+                value = rule_value
+        if value == 'lfs':
+            lfs_paths.add(path)
+    return lfs_paths
+
+def count_vba_related_files_in_tree(token, repo_slug, tree, max_probes=None):
+    """
+    Same counts as count_vba_related_files, computed from the entries returned by get_repo_tree.
+    The checks only need to know whether an extension holds VBA code, so the blobs of an extension
+    stop being probed once one of them does (its count is then 1 at most).
+    Returns None when more than max_probes blobs would have to be downloaded: the repo has to be cloned instead.
+    """
+    counts = {ext: 0 for ext in get_vba_extensions()}
+    max_probes = TREE_PROBE_LIMIT if max_probes is None else max_probes
+
+    # Symbolic links (mode 120000) and submodules are not regular files
+    blobs = [entry for entry in tree if entry['type'] == 'blob' and entry.get('mode') != '120000']
+
+    # Office documents are zip (or OLE) containers and therefore binary, unless the repo only holds an LFS pointer,
+    # the same rule as for the files left out by a sparse checkout
+    office_paths = [entry['path'] for entry in blobs if match_extensions(entry['path'].rsplit('/', 1)[-1])[1] == 'binary']
+    lfs_paths = get_tree_lfs_paths(token, repo_slug, tree, office_paths)
+
+    probes = 0
+    for entry in blobs:
+        file = entry['path'].rsplit('/', 1)[-1]
+        extensions, probe = match_extensions(file)
+        if probe == 'vba':
+            if all(counts[ext] > 0 for ext in extensions):
+                continue
+            if probes >= max_probes:
+                print(f"🟡 More than {max_probes} blobs of {repo_slug} to probe through the API.")
+                return None
+            probes += 1
+        path = entry['path']
+        sha = entry['sha']
+        count_file(
+            counts,
+            file,
+            lambda: blob_has_vba_code(token, repo_slug, sha),
+            lambda: path not in lfs_paths,
+        )
 
     # Print the counts
     for ext, count in counts.items():
         if count > 0:
             print(f"Number of '{ext}' files: {count}")
-    
+
     return counts
 
-def is_vba_file(file_path):
-    with open(file_path, 'r', encoding='cp1252', errors='ignore') as f:
-        file_content = f.read()
-    return has_vba_code(file_content)
+def tree_has_folder(tree, folder):
+    return any(entry['type'] == 'tree' and entry['path'] == folder for entry in tree)
+
+def is_vba_file(file_path, max_bytes=VBA_PROBE_MAX_BYTES, chunk_size=VBA_PROBE_CHUNK_BYTES):
+    """True if one of the first max_bytes of the file starts a Sub or a Function."""
+    def read_chunks():
+        remaining = max_bytes
+        with open(file_path, 'rb') as f:
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                yield chunk
+    return has_vba_code_in_chunks(read_chunks())
+
+VBA_PATTERN = re.compile(r'^\s*(Public|Private)?\s*(Sub|Function)\s+', re.MULTILINE)
 
 def has_vba_code(file_content):
-    vba_pattern = re.compile(r'^\s*(Public|Private)?\s*(Sub|Function)\s+', re.MULTILINE)
-    return bool(vba_pattern.search(file_content))
+    return bool(VBA_PATTERN.search(file_content))
+
+def has_vba_code_in_chunks(chunks):
+    """
+    Search byte chunks for VBA code, stopping at the first match.
+    The last line of a chunk is carried over to the next one so that a declaration split between
+    two chunks is still found. A NUL byte in the first chunk means the file is binary.
+    """
+    carry = ''
+    for index, chunk in enumerate(chunks):
+        if index == 0 and b'\x00' in chunk:
+            return False
+        # cp1252 is a single-byte encoding, chunks can be decoded separately (newlines as in text mode)
+        text = carry + chunk.decode('cp1252', errors='ignore').replace('\r\n', '\n').replace('\r', '\n')
+        if has_vba_code(text):
+            return True
+        carry = text[text.rfind('\n') + 1:]
+    return False
 
 # Get the labels for the issue and extract the name of the check (Check A, Check B, etc.)
 def get_check(issue):
@@ -642,6 +1221,11 @@ def get_problematic_files_check_g(parsed_data, repo_path=None):
     """
     problematic_files_check_g = []
 
+    # The header checks of blobs seen before are answered by the blob memo
+    blob_ids = {}
+    if blob_memo is not None and repo_path:
+        blob_ids = get_blob_ids(repo_path, [fname for fname in parsed_data if fname.endswith((".frm", ".cls"))])
+
     for fname, info in parsed_data.items():
         if (fname.endswith(".frm") or fname.endswith(".cls")) and info.index == "lf":
             full_path = os.path.join(repo_path, fname) if repo_path else fname
@@ -651,121 +1235,33 @@ def get_problematic_files_check_g(parsed_data, repo_path=None):
                 continue
 
             # Skip .cls files that are not exported VBA class modules (adding a .gitattributes won't be enough to make them be imported as class modules in the VBE).
-            if fname.endswith(".cls") and not has_vba_class_header(full_path):
+            if fname.endswith(".cls") and not memoized_verdict(blob_ids.get(fname), 'class_header', lambda: has_vba_class_header(full_path)):
                 continue
 
             # Skip files with double LF in header (valid format per issue #1169)
-            if has_double_lf_header(full_path):
+            if memoized_verdict(blob_ids.get(fname), 'double_lf', lambda: has_double_lf_header(full_path)):
                 continue
 
             problematic_files_check_g.append(fname)
     
     return problematic_files_check_g
 
-
-
-def generate_body_for_issue_for_scanned_repo(previous, new_repos):
-    """
-    This function will receive a list of repos and generate the body for the issue
-    The body of the issue will be a TOML file formatted as a code block
-    The format will be:
-    ```toml
-    [repo_slug]
-    repo_name = "repo_name"
-    repo_url = "repo_url"
-    repo_owner = "repo_owner"
-    commit_id = "latest_commit"
-    scan_date = "analysis_date"
-    outcome = "outcome"
-    """
-
-    # parse the previous issue body
-    # and create a dictionary with the repo_slug as the key
-    # and the rest of the information as the value
-    previous_repos = {}
-    for line in previous.splitlines():
-        if line.startswith("[") and line.endswith("]"):
-            repo_slug = line[1:-1]
-            previous_repos[repo_slug] = {}
-        elif "=" in line:
-            key, value = line.split("=")
-            key = key.strip()
-            value = value.strip().strip('"')
-            previous_repos[repo_slug][key] = value
-    
-    # Now we can create the body for the new issue
-    # If the scan_date for a repo is older than a week, we can remove it from the body
-    # If the repo is not in the previous issue, we can add it to the body
-    # If the repo is in the previous issue, we can update the scan_date and outcome if the commit_id is different
-    current_repos = {}
-    for repo in previous_repos:
-        repo_slug = f"{repo['owner']['login']}/{repo['name']}"
-        # Check if the repo was scanned in the last week
-        scan_date = datetime.datetime.strptime(repo['scan_date'], "%Y-%m-%d")
-        if (datetime.datetime.now() - scan_date).days <= 7:
-            # Add the repo to the current repos
-            current_repos[repo_slug] = {
-                'repo_name': repo['name'],
-                'repo_url': repo['html_url'],
-                'repo_owner': repo['owner']['login'],
-                'commit_id': repo['commit_id'],
-                'scan_date': repo['scan_date'],
-                'outcome': repo['outcome']
-            }
-    
-    # Loop over repos in repos and add them to the current_repos
-    for repo in new_repos:
-        repo_slug = f"{repo['owner']['login']}/{repo['name']}"
-        # Check if the repo is already in the current_repos
-        if repo_slug not in current_repos:
-            # Add the repo to the current_repos
-            current_repos[repo_slug] = {
-                'repo_name': repo['name'],
-                'repo_url': repo['html_url'],
-                'repo_owner': repo['owner']['login'],
-                'commit_id': repo['commit_id'],
-                'scan_date': repo['scan_date'],
-                'outcome': repo['outcome']
-            }
-        else:
-            # Check if the commit_id is different
-            if current_repos[repo_slug]['commit_id'] != repo['commit_id']:
-                # Update the commit_id and scan_date
-                current_repos[repo_slug]['commit_id'] = repo['commit_id']
-                current_repos[repo_slug]['scan_date'] = repo['scan_date']
-                current_repos[repo_slug]['outcome'] = repo['outcome']
-
-    # Now we can create the body for the new issue
-    body = "```toml\n"
-    for repo in current_repos:
-        body += f"[{repo['owner']['login']}/{repo['name']}]\n"
-        body += f'repo_name = "{repo["name"]}"\n'
-        body += f'repo_url = "{repo["html_url"]}"\n'
-        body += f'repo_owner = "{repo["owner"]["login"]}"\n'
-        body += f'commit_id = "{repo["commit_id"]}"\n'
-        body += f'scan_date = "{repo["scan_date"]}"\n'
-        body += f'outcome = "{repo["outcome"]}"\n'
-        body += "\n"
-    body += "```"
-    return body
+# Only .frm and .cls files are looked at by Checks E, F and G
+EOL_PATHSPECS = ['*.frm', '*.cls']
+EOL_EXTENSIONS = ('.frm', '.cls')
 
 def get_git_ls_files_output(repo_path):
     """
-    Get the output of 'git ls-files --eol' for the given repo path.
-    Returns a list of lines from the command output.
+    Get the lines of 'git ls-files --eol' for the .frm and .cls files of the given repo path,
+    taken from the file inventory of the clone (paths are not quoted).
+
+    The other files are left out: the EOL of a file in the index can only be computed from its content,
+    which a blobless clone would have to download for every file that isn't checked out.
     """
     try:
-        print(f"Running 'git ls-files --eol' in {repo_path}")
-        result = subprocess.run(
-            ["git", "ls-files", "--eol"],
-            cwd=repo_path,
-            capture_output=True,
-            text=True
-        )
-        if result.returncode != 0:
-            print(f"🔴 Error running 'git ls-files --eol': {result.stderr.strip()}")
-            return []
-        return result.stdout.splitlines()
+        print(f"Reading the EOL of the .frm and .cls files in {repo_path}")
+        return [f"{entry.eol_info}\t{entry.path}" for entry in get_file_inventory(repo_path).eol_entries()
+                if entry.path.endswith(EOL_EXTENSIONS)]
     except Exception as e:
         print(f"🔴 Error while getting git ls-files output: {e}")
         return []
@@ -820,11 +1316,18 @@ def is_repo_empty(repo_path):
         print(f"🔴 .git directory does not exist in {repo_path}")
         raise ValueError(".git directory does not exist.")
     
-    # Check if there are any files in the repo (excluding .git)
-    for root, dirs, files in os.walk(repo_path):
-        # Remove the '.git' directory from the list of directories to avoid descending into it
-        dirs[:] = [d for d in dirs if d != '.git']
-        if files:
-            return False  # Found files, repo is not empty
-    
-    return True  # No files found, repo is empty
+    # The index also lists the files left out by a sparse checkout
+    return get_file_inventory(repo_path).is_empty()
+
+def remote_folder_exists(token, repo_slug, folder):
+    # Ask the contents API instead of cloning when only the presence of a folder matters
+    response = get_client(token).get(f"/repos/{repo_slug}/contents/{folder}", cache=True)
+
+    if response.status_code == 200:
+        # A folder is listed as an array of entries, a file as a single object
+        return isinstance(response.json(), list)
+    elif response.status_code == 404:
+        return False
+    else:
+        print(f"🔴 Failed to fetch the contents of {folder} in {repo_slug}. Status code: {response.status_code}")
+        raise ValueError("Problem while fetching repository contents.")
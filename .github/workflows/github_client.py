@@ -0,0 +1,130 @@
+# Shared HTTP client for the GitHub REST API
+import os
+import requests
+import http_cache
+import rate_limit
+
+API_URL = "https://api.github.com"
+
+# Size of the keep-alive connection pool kept open towards api.github.com
+POOL_SIZE = 10
+
+class GitHubClient:
+    """
+    Holds the token, base URL and default headers for the GitHub API and reuses a single
+    requests.Session so that consecutive calls share pooled keep-alive connections
+    instead of doing a new TLS handshake every time.
+    """
+
+    def __init__(self, token=None, base_url=API_URL, pool_size=POOL_SIZE, cache=None, limiter=None):
+        self.token = token
+        self.cache = cache
+        self.limiter = limiter if limiter is not None else rate_limit.RateLimiter()
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        self.headers = {'Accept': 'application/vnd.github.v3+json'}
+        if token:
+            self.headers['Authorization'] = f'token {token}'
+        self._session = None
+
+    @property
+    def session(self):
+        # The session is created lazily so that importing this module has no side effect
+        if self._session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            session.mount('https://', adapter)
+            session.headers.update(self.headers)
+            self._session = session
+        return self._session
+
+    def url(self, path):
+        """Return an absolute URL for a path relative to the API root (absolute URLs are left untouched)."""
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method, path, retry_server_errors=None, **kwargs):
+        """
+        Send a request, pacing it against the rate limits and retrying when GitHub asks us to back off.
+        Server errors are only retried for idempotent methods, unless retry_server_errors says otherwise.
+        """
+        attempt = 0
+        while True:
+            self.limiter.before_request(method, path)
+            response = self.session.request(method, self.url(path), **kwargs)
+            self.limiter.after_response(path, response)
+
+            delay = self.limiter.retry_delay(response, attempt, method, retry_server_errors)
+            if delay is None:
+                return response
+            attempt += 1
+            self.limiter.wait(delay, f"{method} {path} answered {response.status_code} (retry {attempt}/{self.limiter.max_retries})")
+
+    def get(self, path, cache=False, **kwargs):
+        """
+        GET a resource. With cache=True, the request is made conditional on the cached
+        ETag/Last-Modified and a 304 answer is served from the on-disk cache.
+        """
+        if not cache or self.cache is None:
+            return self.request('GET', path, **kwargs)
+
+        key = http_cache.cache_key(self.url(path), kwargs.get('params'))
+        headers = dict(kwargs.pop('headers', None) or {})
+        headers.update(self.cache.validators(key))
+        response = self.request('GET', path, headers=headers, **kwargs)
+
+        if response.status_code == 304:
+            entry = self.cache.get(key)
+            if entry is not None:
+                return http_cache.CachedResponse(self.url(path), entry['body'], entry['headers'])
+            # The entry was evicted in the meantime, ask again without validators
+            headers.pop('If-None-Match', None)
+            headers.pop('If-Modified-Since', None)
+            response = self.request('GET', path, headers=headers, **kwargs)
+
+        if response.status_code == 200:
+            self.cache.put(key, response.content, response.headers)
+        return response
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def patch(self, path, **kwargs):
+        return self.request('PATCH', path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request('DELETE', path, **kwargs)
+
+    def graphql(self, query, variables=None):
+        """Run a GraphQL query and return the decoded JSON answer (with its 'data' and 'errors' keys)."""
+        # A query only reads, it can be sent again after a server error (a mutation can't)
+        is_query = not query.lstrip().startswith('mutation')
+        response = self.post('/graphql', retry_server_errors=is_query, json={'query': query, 'variables': variables or {}})
+        if response.status_code != 200:
+            raise ValueError(f"GraphQL query failed. Status code: {response.status_code}")
+        return response.json()
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+# One client per token for the whole run
+_clients = {}
+_default_cache = None
+
+def get_default_cache():
+    """Return the HTTP cache shared by all clients (location can be overridden with GITHUB_HTTP_CACHE)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = http_cache.HttpCache(os.getenv('GITHUB_HTTP_CACHE', http_cache.DEFAULT_CACHE_PATH))
+    return _default_cache
+
+def get_client(token=None):
+    """Return the shared GitHubClient for the given token, creating it on first use."""
+    client = _clients.get(token)
+    if client is None:
+        client = GitHubClient(token, cache=get_default_cache())
+        _clients[token] = client
+    return client
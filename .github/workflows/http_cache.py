@@ -0,0 +1,183 @@
+# On-disk cache for conditional GitHub REST requests (ETag / Last-Modified)
+# GitHub doesn't count "304 Not Modified" answers against the rate limit, so revalidating
+# a cached resource is almost free compared to downloading it again.
+#
+# Usage: python './.github/workflows/http_cache.py' [--path PATH] {stats,list,clear}
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.path.join('.cache', 'github-http.sqlite')
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Response headers worth keeping alongside the cached body
+KEPT_HEADERS = ['Content-Type', 'ETag', 'Last-Modified', 'Link']
+
+class CachedResponse:
+    """Minimal stand-in for requests.Response built from a cache entry."""
+
+    def __init__(self, url, content, headers, status_code=200):
+        self.url = url
+        self.content = content
+        self.headers = headers
+        self.status_code = status_code
+        self.from_cache = True
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    def json(self):
+        return json.loads(self.content)
+
+def cache_key(url, params=None):
+    """Build the cache key from the URL and the query parameters (order independent)."""
+    if not params:
+        return url
+    query = '&'.join(f"{key}={params[key]}" for key in sorted(params))
+    return f"{url}?{query}"
+
+class HttpCache:
+    """
+    Persistent store of GET response bodies along with their validators.
+    Entries are evicted in least-recently-used order once the total size goes above max_bytes.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._connection = None
+        # Pages can be fetched from several threads, the connection is shared behind this lock
+        self._lock = threading.RLock()
+
+    @property
+    def _db(self):
+        # The database is opened on first use so that a run without cached reads leaves no file behind
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._create_table()
+        return self._connection
+
+    def _create_table(self):
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " headers TEXT NOT NULL,"
+            " body BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def get(self, key):
+        """Return the entry for the key as a dict, or None if it isn't cached."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, headers, body FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            etag, last_modified, headers, body = row
+            return {'etag': etag, 'last_modified': last_modified, 'headers': json.loads(headers), 'body': body}
+
+    def validators(self, key):
+        """Return the conditional request headers to send for the key (empty if not cached)."""
+        entry = self.get(key)
+        if entry is None:
+            return {}
+        if entry['etag']:
+            return {'If-None-Match': entry['etag']}
+        if entry['last_modified']:
+            return {'If-Modified-Since': entry['last_modified']}
+        return {}
+
+    def put(self, key, body, headers):
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            # Nothing to revalidate with, so there is no point in keeping the body
+            return
+        kept_headers = {name: headers[name] for name in KEPT_HEADERS if headers.get(name)}
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, etag, last_modified, headers, body, size, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, etag, last_modified, json.dumps(kept_headers), body, len(body), time.time())
+            )
+            self._db.commit()
+            self.evict()
+
+    def evict(self):
+        """Drop least-recently-used entries until the cache fits in max_bytes."""
+        with self._lock:
+            total = self.total_size()
+            if total <= self.max_bytes:
+                return 0
+            evicted = 0
+            for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+                if total <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+            self._db.commit()
+            return evicted
+
+    def total_size(self):
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def entries(self):
+        """List (key, size, last_access) tuples, most recently used first."""
+        with self._lock:
+            return self._db.execute("SELECT key, size, last_access FROM entries ORDER BY last_access DESC").fetchall()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+            self._db.execute("VACUUM")
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or clear the GitHub HTTP cache.')
+    parser.add_argument('--path', default=os.getenv('GITHUB_HTTP_CACHE', DEFAULT_CACHE_PATH), help='Path to the cache database.')
+    parser.add_argument('command', choices=['stats', 'list', 'clear'])
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        print(f"No cache found at {args.path}")
+        return
+
+    cache = HttpCache(args.path)
+    entries = cache.entries()
+    if args.command == 'stats':
+        print(f"Cache: {args.path}")
+        print(f"Entries: {len(entries)}")
+        print(f"Size: {cache.total_size()}/{cache.max_bytes} bytes")
+    elif args.command == 'list':
+        for key, size, last_access in entries:
+            last_access_str = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(last_access))
+            print(f"{last_access_str}  {size:>10}  {key}")
+    elif args.command == 'clear':
+        cache.clear()
+        print(f"Removed {len(entries)} entries from {args.path}")
+    cache.close()
+
+if __name__ == "__main__":
+    main()
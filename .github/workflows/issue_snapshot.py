@@ -0,0 +1,126 @@
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Set
+import json
+import os
+
+import utils
+
+@dataclass
+class IssueRecord:
+    number: int
+    title: str
+    state: str
+    labels: List[str] = field(default_factory=list)
+    user: Optional[str] = None  # Owner of the scanned repo, parsed from the issue title
+    closed_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+    @classmethod
+    def from_api(cls, issue):
+        """Build a compact record from an issue object returned by the GitHub API."""
+        state = issue.get('state') or ('closed' if issue.get('closed_at') else 'open')
+        labels = [label['name'] if isinstance(label, dict) else label for label in issue.get('labels', [])]
+        title = issue.get('title') or ''
+        return cls(
+            number=issue.get('number'),
+            title=title,
+            state=state,
+            labels=labels,
+            user=utils.get_user_from_title(title),
+            closed_at=issue.get('closed_at'),
+            updated_at=issue.get('updated_at'),
+        )
+
+class IssueSnapshot:
+    """
+    All the issues of a repo (open and closed) with the lookups needed during a run:
+    open/closed views, closed issues by exact title and issues per user.
+    """
+
+    def __init__(self, records=()):
+        self.records: Dict[int, IssueRecord] = {}
+        self._closed_by_title: Dict[str, int] = {}
+        self._numbers_by_user: Dict[str, Set[int]] = {}
+        for record in records:
+            self.upsert(record)
+
+    @classmethod
+    def from_api(cls, issues):
+        return cls(IssueRecord.from_api(issue) for issue in issues)
+
+    def __len__(self):
+        return len(self.records)
+
+    def upsert(self, record):
+        """Add or replace a record, keeping the lookup indexes in sync."""
+        if isinstance(record, dict):
+            record = IssueRecord.from_api(record)
+
+        previous = self.records.get(record.number)
+        if previous is not None:
+            if self._closed_by_title.get(previous.title) == previous.number:
+                del self._closed_by_title[previous.title]
+                # Another closed issue may share the same title
+                for other in self.records.values():
+                    if other.number != previous.number and other.state == 'closed' and other.title == previous.title:
+                        self._closed_by_title[other.title] = other.number
+                        break
+            if previous.user in self._numbers_by_user:
+                self._numbers_by_user[previous.user].discard(previous.number)
+
+        self.records[record.number] = record
+        if record.state == 'closed':
+            self._closed_by_title.setdefault(record.title, record.number)
+        if record.user:
+            self._numbers_by_user.setdefault(record.user, set()).add(record.number)
+        return record
+
+    def last_updated_at(self):
+        """Return the most recent updated_at timestamp (GitHub's clock), used as the cursor for incremental syncs."""
+        timestamps = [record.updated_at for record in self.records.values() if record.updated_at]
+        return max(timestamps) if timestamps else None
+
+    def save(self, path):
+        """Write the snapshot as JSON Lines, one issue per line."""
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            for number in sorted(self.records):
+                file.write(json.dumps(asdict(self.records[number]), separators=(',', ':')) + '\n')
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read a snapshot written by save(), or return None if there is none."""
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as file:
+            return cls(IssueRecord(**json.loads(line)) for line in file if line.strip())
+
+    def get(self, number):
+        return self.records.get(number)
+
+    def open_issues(self):
+        return [record for record in self.records.values() if record.state == 'open']
+
+    def closed_issues(self):
+        return [record for record in self.records.values() if record.state == 'closed']
+
+    def titles(self):
+        return [record.title for record in self.records.values()]
+
+    def find_closed_by_title(self, title):
+        """Return the closed issue with exactly this title, or None."""
+        number = self._closed_by_title.get(title)
+        return self.records.get(number) if number is not None else None
+
+    def issues_for_user(self, user):
+        return [self.records[number] for number in sorted(self._numbers_by_user.get(user, ()))]
+
+    def has_issue_for_user(self, user):
+        return bool(self._numbers_by_user.get(user))
+
+    def has_open_issue_for_user(self, user):
+        return any(record.state == 'open' for record in self.issues_for_user(user))
@@ -0,0 +1,142 @@
+# Pacing and retry policy for the GitHub API rate limits
+# REF: https://docs.github.com/en/rest/using-the-rest-api/rate-limits-for-the-rest-api
+import collections
+import random
+import threading
+import time
+
+# Methods that create or modify content and count towards the secondary (content creation) limits
+WRITE_METHODS = {'POST', 'PATCH', 'PUT', 'DELETE'}
+
+# GitHub asks to wait at least one second between content-creating requests
+# and allows at most 500 of them per hour
+WRITE_INTERVAL = 1.0
+WRITES_PER_HOUR = 500
+
+# Secondary rate limits without a Retry-After header: wait at least one minute, then back off exponentially
+SECONDARY_BACKOFF = 60.0
+# Server errors: short exponential backoff
+SERVER_ERROR_BACKOFF = 1.0
+MAX_BACKOFF = 15 * 60.0
+
+MAX_RETRIES = 5
+# Never wait longer than this for a single retry (primary limits reset at most one hour later)
+MAX_WAIT = 3600.0
+
+RETRYABLE_SERVER_ERRORS = {500, 502, 503, 504}
+
+# A server error doesn't tell whether the request was processed, only requests that can safely be
+# sent twice are retried (a POST that succeeded behind a 502 would create a duplicate issue or comment)
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'PUT', 'DELETE'}
+
+def resource_for_path(path):
+    """Guess the rate limit bucket (X-RateLimit-Resource) that a request will count against."""
+    if '/search/' in path:
+        return 'search'
+    if path.rstrip('/').endswith('/graphql'):
+        return 'graphql'
+    return 'core'
+
+class RateLimiter:
+    """
+    Keeps track of the rate limit headers returned by GitHub, delays requests that would
+    exceed the primary or secondary limits and decides how long to wait before a retry.
+    """
+
+    def __init__(self, sleep=time.sleep, clock=time.time, max_retries=MAX_RETRIES):
+        self.sleep = sleep
+        self.clock = clock
+        self.max_retries = max_retries
+        # resource -> (remaining, reset epoch)
+        self.limits = {}
+        self.recent_writes = collections.deque()
+        self._lock = threading.Lock()
+
+    def wait(self, seconds, reason):
+        seconds = min(max(seconds, 0), MAX_WAIT)
+        if seconds > 0:
+            print(f"🟡 {reason}. Waiting {seconds:.1f}s before the next request.")
+            self.sleep(seconds)
+
+    def before_request(self, method, path):
+        """Block until the request can be sent without going over a known limit."""
+        remaining, reset = self.limits.get(resource_for_path(path), (None, None))
+        if remaining == 0 and reset is not None and reset > self.clock():
+            self.wait(reset - self.clock() + 1, f"Rate limit for '{resource_for_path(path)}' exhausted")
+
+        # GraphQL queries are sent with POST but don't create content
+        if method.upper() in WRITE_METHODS and resource_for_path(path) != 'graphql':
+            # Writes are serialized so that concurrent callers are spaced out as well
+            with self._lock:
+                now = self.clock()
+                while self.recent_writes and now - self.recent_writes[0] >= 3600:
+                    self.recent_writes.popleft()
+                if len(self.recent_writes) >= WRITES_PER_HOUR:
+                    self.wait(self.recent_writes[0] + 3600 - now, "Hourly content creation limit reached")
+                elif self.recent_writes and now - self.recent_writes[-1] < WRITE_INTERVAL:
+                    self.wait(self.recent_writes[-1] + WRITE_INTERVAL - now, "Pacing content creation requests")
+                self.recent_writes.append(self.clock())
+
+    def after_response(self, path, response):
+        """Record the X-RateLimit-* headers of a response."""
+        headers = response.headers
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        if remaining is None or reset is None:
+            return
+        resource = headers.get('X-RateLimit-Resource') or resource_for_path(path)
+        try:
+            limit = (int(remaining), float(reset))
+        except ValueError:
+            return
+        with self._lock:
+            self.limits[resource] = limit
+
+    def retry_delay(self, response, attempt, method='GET', retry_server_errors=None):
+        """
+        Return the number of seconds to wait before retrying the response, or None if it shouldn't be retried.
+
+        Args:
+            response: The response that was received
+            attempt: Number of retries already done for this request (0 for the first answer)
+            method: HTTP method of the request
+            retry_server_errors: Whether a 5xx answer is retried, by default only for idempotent methods.
+                Rate limit answers (403/429) are always retried since the request wasn't processed.
+        """
+        if attempt >= self.max_retries:
+            return None
+
+        status = response.status_code
+        headers = response.headers
+
+        if status in (403, 429):
+            retry_after = headers.get('Retry-After')
+            if retry_after is not None:
+                try:
+                    return float(retry_after)
+                except ValueError:
+                    pass
+
+            if headers.get('X-RateLimit-Remaining') == '0' and headers.get('X-RateLimit-Reset'):
+                try:
+                    return float(headers['X-RateLimit-Reset']) - self.clock() + 1
+                except ValueError:
+                    pass
+
+            # A 403 is also used for plain permission problems, only retry when it's about rate limiting
+            if status == 429 or 'rate limit' in (getattr(response, 'text', '') or '').lower():
+                return self.backoff(SECONDARY_BACKOFF, attempt)
+            return None
+
+        if status in RETRYABLE_SERVER_ERRORS:
+            if retry_server_errors is None:
+                retry_server_errors = method.upper() in IDEMPOTENT_METHODS
+            if retry_server_errors:
+                return self.backoff(SERVER_ERROR_BACKOFF, attempt)
+
+        return None
+
+    def backoff(self, base, attempt):
+        """Exponential backoff with jitter (the delay is drawn from the upper half of the interval)."""
+        delay = min(base * (2 ** attempt), MAX_BACKOFF)
+        return random.uniform(delay / 2, delay)
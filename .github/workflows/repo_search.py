@@ -0,0 +1,90 @@
+# Crawler for the repository search API
+import concurrent.futures
+import datetime
+from github_client import get_client
+
+# The search API never returns more than this many results for a query, whatever the page
+SEARCH_RESULT_CAP = 1000
+
+# Maximum page size accepted by the search API
+SEARCH_PER_PAGE = 100
+
+# Pages fetched at the same time (the search bucket of the rate limiter paces them)
+MAX_SEARCH_WORKERS = 3
+
+# No repository was pushed before GitHub existed
+SEARCH_EPOCH = datetime.datetime(2008, 1, 1, tzinfo=datetime.timezone.utc)
+
+def format_timestamp(moment):
+    return moment.astimezone(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def windowed_query(query, start, end):
+    """Restrict the query to the repos pushed between start and end (both included)."""
+    return f"{query} pushed:{format_timestamp(start)}..{format_timestamp(end)}"
+
+def search_page(token, query, page=1, per_page=SEARCH_PER_PAGE, sort='updated', order='desc'):
+    params = {
+        'q': query,
+        'sort': sort,
+        'order': order,
+        'per_page': per_page,
+        'page': page
+    }
+    response = get_client(token).get("/search/repositories", params=params)
+    if response.status_code != 200:
+        print(f"🔴 Failed to search repositories (page {page}). Status code: {response.status_code}")
+        raise ValueError("Problem while searching repositories.")
+    results = response.json()
+    if results.get('incomplete_results'):
+        print(f"🟡 Search results are incomplete for: {query}")
+    return results
+
+def search_window(token, query, start, end, per_page=SEARCH_PER_PAGE):
+    """
+    Return the repos matching the query that were pushed between start and end.
+
+    The window is split in two halves, recursively, as long as it holds more results than
+    the search API is willing to return. The pages of a window small enough are fetched concurrently.
+    """
+    first = search_page(token, windowed_query(query, start, end), per_page=per_page)
+    total_count = first['total_count']
+
+    if total_count > SEARCH_RESULT_CAP and end - start > datetime.timedelta(seconds=1):
+        middle = start + (end - start) / 2
+        middle = middle.replace(microsecond=0)
+        print(f"ℹ️ {total_count} results pushed between {format_timestamp(start)} and {format_timestamp(end)}, splitting the window")
+        # Most recent half first so that the results stay sorted from newest to oldest
+        newer = search_window(token, query, middle + datetime.timedelta(seconds=1), end, per_page)
+        older = search_window(token, query, start, middle, per_page)
+        return newer + older
+
+    if total_count > SEARCH_RESULT_CAP:
+        print(f"🟡 More than {SEARCH_RESULT_CAP} results pushed at {format_timestamp(start)}, only the first {SEARCH_RESULT_CAP} are available")
+
+    items = list(first['items'])
+    last_page = -(-min(total_count, SEARCH_RESULT_CAP) // per_page)
+    if last_page > 1:
+        def fetch_page(page):
+            return search_page(token, windowed_query(query, start, end), page=page, per_page=per_page)['items']
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(MAX_SEARCH_WORKERS, last_page - 1)) as executor:
+            for page_items in executor.map(fetch_page, range(2, last_page + 1)):
+                items.extend(page_items)
+    return items
+
+def crawl_repos(token, query, start=None, end=None, per_page=SEARCH_PER_PAGE):
+    """
+    Return every repo matching the query pushed between start (default: SEARCH_EPOCH) and end (default: now),
+    deduplicated by repo id. A repo pushed while the crawl is running can show up in two windows.
+    """
+    start = start or SEARCH_EPOCH
+    end = end or datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+
+    repos = []
+    seen_ids = set()
+    for repo in search_window(token, query, start, end, per_page):
+        if repo['id'] in seen_ids:
+            continue
+        seen_ids.add(repo['id'])
+        repos.append(repo)
+    return repos
@@ -1,57 +1,42 @@
-import requests
 import os
+import argparse
+import datetime
 import subprocess
-import time
 import hashlib
 # Custom modules
 import gh
 import utils
+import repo_search
+from search_cursor import SearchCursor
+from clone_pool import ClonePool
+from workspace import Workspace
+from scan_store import ScanStore
+from blob_memo import BlobMemo
 
-all_issues_title = None
-all_open_issues_title = None
+issue_snapshot = None
+
+# Pool cloning the next repos while the current one is analysed (set for the duration of main)
+clone_pool = None
+
+# Disk budget of the clones under repos/ (set for the duration of main)
+workspace = None
+
+# Outcome of the previous scans, by repo and push (set for the duration of main)
+scan_store = None
 
 # Number of stars threshold to start analyzing VBA repos for issues with .gitattributes and EOL
 stars_threshold_vba_repo = 2
 
 def already_issue_for_user(user):
-    # Iterate through all issues and check if the user matches
-    for existing_issue in all_issues_title:
-        # Extract the user from the existing issue title
-        user_in_issue = utils.get_user_from_title(existing_issue)
-        if user == user_in_issue:
-            return True
-    return False
+    # Check if any issue (open or closed) was created for the user
+    return issue_snapshot.has_issue_for_user(user)
 
 def already_open_issue_for_user(user):
-    # Iterate through all open issues and check if the user matches
-    for existing_issue in all_open_issues_title:
-        # Extract the user from the existing issue title
-        user_in_issue = utils.get_user_from_title(existing_issue)
-        if user == user_in_issue:
-            return True
-    return False
+    # Check if an open issue was created for the user
+    return issue_snapshot.has_open_issue_for_user(user)
 
  
 
-def search_github_repos(query, sort='updated', order='desc', per_page=60, page=1):
-    url = f"https://api.github.com/search/repositories"
-    headers = {'Accept': 'application/vnd.github.v3+json'}
-    params = {
-        'q': query,
-        'sort': sort,
-        'order': order,
-        'per_page': per_page,
-        'page': page
-    }
-    
-    response = requests.get(url, headers=headers, params=params)
-    
-    if response.status_code == 200:
-        return response.json()
-    else:
-        print(f"Failed to fetch data from GitHub API. Status code: {response.status_code}")
-        return None
-
 def read_template_file(template_path, replacements):
     with open(template_path, 'r', encoding='utf-8') as file:
         template_content = file.read()
@@ -63,8 +48,6 @@ def read_template_file(template_path, replacements):
     return template_content
 
 def report_file_extensions_issue(token, repo, counts):
-    global all_issues
-
     main_repo_slug = os.getenv('GITHUB_REPOSITORY')
 
     try:
@@ -99,8 +82,8 @@ def report_file_extensions_issue(token, repo, counts):
             # This means that we have to call the github API and edit the following issue https://github.com/DecimalTurn/VBA-GitHub-Checks/issues/871
             # We simply want to add a the URL of the repo as a new bullet point to the list 
             new_repo = f" 1. {repo['html_url']}\n"
-            gh.append_to_issue_body_if_missing(token, main_repo_slug, 871, new_repo)
-            print(f"🔴 Repo {repo['html_url']} contain VBA-Enabled Office documents, but not any source code. Logged in issue #871.")
+            gh.queue_issue_body_append(main_repo_slug, 871, new_repo)
+            print(f"🔴 Repo {repo['html_url']} contain VBA-Enabled Office documents, but not any source code. Queued for issue #871.")
             return
         
         print("🟢 No issues detected based on file extensions.")
@@ -146,55 +129,12 @@ def create_issue_wrapper(token, repo, issue_title_suffix, template_name, label_n
             print(f"🔴 Error creating GitHub issue: {e}")
             return False
 
-        if issue_number != 0:
-            try:
-                new_issue = gh.get_issue(token, os.getenv('GITHUB_REPOSITORY'), issue_number)
-                all_issues_title.append(new_issue['title'])
-                return True
-            except Exception as e:
-                print(f"🔴 Error retrieving or appending the issue: {e}")
-                return False
-        
-        return False
+        # create_github_issue already added the new issue to the snapshot from the POST response
+        return bool(issue_number)
 
 def get_slug(repo):
     return repo['owner']['login'] + "/" + repo['name']
 
-def get_open_issues_title(token, repo_slug):
-    """Get titles of only open issues"""
-    url = f"https://api.github.com/repos/{repo_slug}/issues"
-    headers = {
-        'Accept': 'application/vnd.github.v3+json',
-        'Authorization': f'token {token}'
-    }
-    
-    params = {
-        'per_page': 100,  # Maximum number of issues per page
-        'state': 'open',  # Fetch only open issues
-        'page': 1         # Start with the first page
-    }
-    
-    all_open_issues_title = []
-    
-    while True:
-        response = requests.get(url, headers=headers, params=params)
-        
-        if response.status_code == 200:
-            issues = response.json()
-            all_open_issues_title.extend([issue['title'] for issue in issues])
-            
-            if len(issues) < 100:
-                # If fewer than 100 issues were returned, this is the last page
-                break
-            else:
-                # Move to the next page
-                params['page'] += 1
-        else:
-            print(f"🔴 Failed to fetch open issues. Status code: {response.status_code}")
-            raise ValueError("Problem while fetching open issues.")
-    
-    return all_open_issues_title
-
 def get_username_sha256(username):
     """Compute SHA256 hash of a username"""
     return hashlib.sha256(username.encode('utf-8')).hexdigest().lower()
@@ -214,8 +154,70 @@ def has_xvba_modules_folder(repo_path):
     Returns:
         True if xvba_modules folder exists in root directory, False otherwise
     """
-    xvba_modules_path = os.path.join(repo_path, 'xvba_modules')
-    return os.path.isdir(xvba_modules_path)
+    # Looked up in the index: the folder is missing from a sparse checkout when it holds no VBA-related file
+    return gh.get_file_inventory(repo_path).has_folder('xvba_modules')
+
+# Checks that need a clone to look at the Git index (EOL and attributes of the files)
+CLONE_CHECKS = ['Check E', 'Check F', 'Check G']
+
+def plan_checks(repo):
+    """
+    Work out from the search item which checks could create an issue (or a tracking entry) for the repo.
+
+    Args:
+        repo: Repository object returned by the search API
+
+    Returns:
+        The labels of the checks that can apply. An empty list means the repo doesn't need to be cloned.
+    """
+    language = repo['language']
+    if language == "VBA":
+        if repo['stargazers_count'] >= stars_threshold_vba_repo:
+            return ['Check E', 'Check F', 'Check G']
+        return []
+    if language == "Visual Basic .NET":
+        return ['Check A']
+    if language == "VBScript":
+        return ['Check B']
+    if language is None:
+        # Repos without any source code are tracked in issue #871
+        return ['Check C', 'Check D', 'Issue #871']
+    return []
+
+def will_clone(repo, exclusion_hashes):
+    """True if analyze_repo is expected to clone the repo (used to start the clone ahead of time)."""
+    user = repo['owner']['login']
+    if is_user_excluded(user, exclusion_hashes) or already_open_issue_for_user(user):
+        return False
+    checks = plan_checks(repo)
+    return any(check in CLONE_CHECKS for check in checks) and not already_scanned(repo)
+
+def get_pushed_at(repo):
+    """
+    Time of the last push to the repo, as given by the search result. Scans are recorded against it
+    rather than the SHA of HEAD, which would cost a 'git ls-remote' per repo before knowing whether it is cloned.
+    """
+    return repo.get('pushed_at')
+
+def already_scanned(repo):
+    return scan_store is not None and scan_store.is_fresh(get_slug(repo), get_pushed_at(repo))
+
+def record_scan(repo, outcome):
+    # Failed scans are not recorded so that the next run tries again
+    if scan_store is None or outcome is None:
+        return
+    pushed_at = get_pushed_at(repo)
+    if pushed_at is None:
+        return
+    if has_issue_for_repo(repo):
+        outcome = 'issue'
+    scan_store.record(get_slug(repo), pushed_at, outcome)
+
+def log_xvba_modules_repo(repo):
+    # Log to issue #1108 for repos with xvba_modules folder
+    new_repo = f" 1. {repo['html_url']}\n"
+    gh.queue_issue_body_append(os.getenv('GITHUB_REPOSITORY'), 1108, new_repo)
+    print(f"☑️ Repo {repo['html_url']} contains an xvba_modules folder. Queued for issue #1108.")
 
 def format_filename_for_markdown(filename):
     """
@@ -230,12 +232,11 @@ def format_filename_for_markdown(filename):
     # Escape backticks and other special Markdown characters
     return filename.replace('`', '\\`').replace('_', '\\_')
 
-def main():
+def main(backfill=False, since=None):
 
-    global all_issues_title, all_open_issues_title
+    global issue_snapshot, clone_pool, workspace, scan_store
     token = os.getenv('GITHUB_TOKEN')
-    all_issues_title = gh.get_all_issues_title(token, os.getenv('GITHUB_REPOSITORY'))
-    all_open_issues_title = get_open_issues_title(token, os.getenv('GITHUB_REPOSITORY'))
+    issue_snapshot = gh.get_issue_snapshot(token, os.getenv('GITHUB_REPOSITORY'), persist=True)
 
     # Load exclusion list
     exclusion_file_path = './.github/workflows/exclusion.txt'
@@ -243,28 +244,84 @@ def main():
 
     query = 'VBA NOT VBScript'
     # query = 'VBA in:name,description'
-    per_page = 50  # Number of repos to fetch per page (max: 100)
-    total_pages = 1  # Number of pages to check
 
-    for page in range(1, total_pages + 1):
-        print(f"Fetching page {page}...")
-        repos = search_github_repos(query, per_page=per_page, page=page)
-    
-        if page == 1:
-            print(f"Found {repos['total_count']} repositories")
+    # Repos scanned recently at the same commit are skipped
+    scan_store = ScanStore.load()
+    scan_store.prune()
 
-        if repos:
-            for repo in repos['items']:
-                print('=' * 60)
-                analyze_repo(token, repo, exclusion_hashes)
-                
-        else:
+    # Files already classified in another repo or run are answered by their blob id
+    gh.blob_memo = BlobMemo.load()
+
+    # The cursor remembers where the previous runs stopped, so that only the repos pushed since then are analysed
+    cursor = SearchCursor.load()
+    if backfill:
+        start = since
+        print(f"ℹ️ Backfill mode: processing every repo pushed since {repo_search.format_timestamp(start or repo_search.SEARCH_EPOCH)}")
+    else:
+        start = cursor.start()
+        print(f"ℹ️ Processing repos pushed since {repo_search.format_timestamp(start)}")
+
+    try:
+        # The query is split into pushed: date windows to get past the 1000 results cap of the search API
+        repos = repo_search.crawl_repos(token, query, start=start)
+        print(f"Found {len(repos)} repositories")
+
+        if not backfill:
+            repos = [repo for repo in repos if cursor.is_new(repo)]
+            print(f"{len(repos)} of them were pushed since they were last analysed")
+
+        if not repos:
             print("No repositories found.")
 
-        time.sleep(2)
+        def clone_url(repo):
+            if not will_clone(repo, exclusion_hashes):
+                return None
+            # Leased before the clone starts so that it can't be evicted while being cloned
+            workspace.lease(utils.repo_path(repo['owner']['login'], repo['name']))
+            return repo['html_url']
+
+        workspace = Workspace()
+        with ClonePool() as pool:
+            clone_pool = pool
+            for repo in pool.iterate(repos, clone_url):
+                print('=' * 60)
+                analyze_repo(token, repo, exclusion_hashes)
+                cursor.mark_seen(repo)
+
+        # The high-water mark only moves once every repo of the run was processed
+        cursor.complete()
+    finally:
+        clone_pool = None
+        workspace = None
+        scan_store.save()
+        scan_store = None
+        gh.blob_memo.save()
+        gh.blob_memo = None
+        # Repos found during the run are appended to the tracking issues (#871, #1108) in one go
+        gh.flush_issue_body_appends(token)
+        cursor.save()
 
 def analyze_repo(token, repo, exclusion_hashes):
-    main_repo_slug = os.getenv('GITHUB_REPOSITORY')
+    try:
+        analyze_repo_checks(token, repo, exclusion_hashes)
+    finally:
+        discard_prefetched_clone(repo)
+
+def discard_prefetched_clone(repo):
+    """
+    Wait for a clone started ahead of time that the analysis didn't use (e.g. an issue was opened
+    for the same user earlier in the run) and give its workspace lease back without keeping it.
+    """
+    if clone_pool is None or not clone_pool.submitted(repo['html_url']):
+        return
+    try:
+        clone_pool.wait(repo['html_url'])
+    except Exception as e:
+        print(f"Error cloning the repo: {e}")
+    if workspace is not None:
+        workspace.release(utils.repo_path(repo['owner']['login'], repo['name']), keep=False)
+
+def analyze_repo_checks(token, repo, exclusion_hashes):
 
     print(f"Name: {repo['name']}")
     print(f"Author: {repo['owner']['login']}")
@@ -287,37 +344,81 @@ def analyze_repo(token, repo, exclusion_hashes):
         print('-' * 40)
         return
 
-    # Clone the repo
+    # Skip the clone when no check can apply, the xvba_modules folder is then looked up through the API
+    checks = plan_checks(repo)
+    if not checks:
+        print(f"🟢 No check applies to a {repo['language']} repo with {repo['stargazers_count']} stars. Skipping the clone.")
+        try:
+            if gh.remote_folder_exists(token, get_slug(repo), 'xvba_modules'):
+                log_xvba_modules_repo(repo)
+        except Exception as e:
+            print(f"🔴 Error looking for an xvba_modules folder: {e}")
+        return
+
+    print(f"Checks that can apply: {', '.join(checks)}")
+
+    if already_scanned(repo):
+        record = scan_store.get(get_slug(repo))
+        print(f"🟢 Already scanned since the push of {record.pushed_at} on {record.scan_date} (outcome: {record.outcome}). Skipping.")
+        return
+
+    # Checks A to D only need the file list, which the Git Trees API gives without cloning
+    if not any(check in CLONE_CHECKS for check in checks):
+        try:
+            tree = gh.get_repo_tree(token, get_slug(repo), repo['default_branch'])
+        except Exception as e:
+            print(f"🔴 Error fetching the repository tree, falling back to a clone: {e}")
+            tree = None
+        if tree is not None:
+            outcome = analyze_repo_tree(token, repo, tree)
+            if outcome != NEEDS_CLONE:
+                record_scan(repo, outcome)
+                return
+
+    repo_path = utils.repo_path(repo['owner']['login'], repo['name'])
+    if workspace is not None:
+        workspace.lease(repo_path)
+    outcome = None
+    try:
+        outcome = analyze_repo_clone(token, repo, repo_path)
+    finally:
+        # Only the repos with an issue will be followed up (and fetched again) by check_for_changes
+        if workspace is not None:
+            workspace.release(repo_path, keep=has_issue_for_repo(repo))
+    record_scan(repo, outcome)
+
+def has_issue_for_repo(repo):
+    # Only open issues are followed up by check_for_changes
+    prefix = f"[{get_slug(repo)}]"
+    return any(record.title.startswith(prefix) for record in issue_snapshot.open_issues())
+
+def analyze_repo_clone(token, repo, repo_path):
+    """Clone the repo and run the checks. Returns the outcome of the scan, or None if it failed."""
+    # Clone the repo (it may already have been cloned in the background)
     try:
-        gh.clone_repo(repo['html_url'])
+        if clone_pool is not None:
+            clone_pool.wait(repo['html_url'])
+        else:
+            gh.clone_repo(repo['html_url'])
     except Exception as e:
         print(f"Error cloning the repo: {e}")
         return
-    
-    #TODO : 
-    # Store the commit hash of the last commit, the scan_date and the outcome of the scan to be saved in an issue
-    # Save the information at the end in the issue_for_scanned_repo (see gh.py)
-
-    repo_path = utils.repo_path(repo['owner']['login'], repo['name'])
 
     # Check if the repo is empty
     if gh.is_repo_empty(repo_path):
         print(f"🚫 Repository {repo['html_url']} is empty. Skipping further analysis.")
-        return
+        return 'empty'
 
     try:
-        file_counts = gh.count_vba_related_files(repo_path)
+        file_counts = gh.get_vba_related_file_counts(repo_path)
     except Exception as e:
         print(f"::warning file={__file__}::Error counting VBA-related files in {repo_path}: {e}")
         return
 
     # Check for xvba_modules folder and log to issue #1108 if found
     if has_xvba_modules_folder(repo_path):
-        # Log to issue #1108 for repos with xvba_modules folder
-        new_repo = f" 1. {repo['html_url']}\n"
-        gh.append_to_issue_body_if_missing(token, main_repo_slug, 1108, new_repo)
-        print(f"☑️ Repo {repo['html_url']} contains an xvba_modules folder. Logged in issue #1108.")
-        return
+        log_xvba_modules_repo(repo)
+        return 'xvba_modules'
 
     if repo['language'] == "VBA" and repo['stargazers_count'] >= stars_threshold_vba_repo:
         print('-' * 20)
@@ -336,6 +437,39 @@ def analyze_repo(token, repo, exclusion_hashes):
         print(f"Performing file extension checks")
         report_file_extensions_issue(token, repo, file_counts)
 
+    return 'analysed'
+
+# Outcome of analyze_repo_tree when the repo has too many files to probe through the API
+NEEDS_CLONE = 'needs_clone'
+
+def analyze_repo_tree(token, repo, tree):
+    """
+    Run the file extension checks on the tree of the repo. Returns the outcome of the scan, None if it failed,
+    or NEEDS_CLONE if the repo has to be cloned instead.
+    """
+    if not tree:
+        print(f"🚫 Repository {repo['html_url']} is empty. Skipping further analysis.")
+        return 'empty'
+
+    try:
+        file_counts = gh.count_vba_related_files_in_tree(token, get_slug(repo), tree)
+    except Exception as e:
+        print(f"::warning file={__file__}::Error counting VBA-related files in {get_slug(repo)}: {e}")
+        return
+    if file_counts is None:
+        print(f"🟡 Falling back to a clone of {repo['html_url']}.")
+        return NEEDS_CLONE
+
+    if gh.tree_has_folder(tree, 'xvba_modules'):
+        log_xvba_modules_repo(repo)
+        return 'xvba_modules'
+
+    print('-' * 20)
+    print(f"Performing file extension checks")
+    report_file_extensions_issue(token, repo, file_counts)
+
+    return 'analysed'
+
 def report_missing_gitattributes_issue(repo_path, counts, token, repo):
     """
     Check if a .gitattributes file is needed and create Check G issue if appropriate.
@@ -443,7 +577,15 @@ def report_eol_issues(repo_path, counts, token, repo):
     
     return  # No return value needed
 
+def parse_date(value):
+    return datetime.datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=datetime.timezone.utc)
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description='Search for VBA repos and suggest fixes for the problems found.')
+    parser.add_argument('--backfill', action='store_true', help='Process every repo found, even those already analysed, instead of resuming from the search cursor.')
+    parser.add_argument('--since', type=parse_date, help='With --backfill, only process repos pushed since this date (YYYY-MM-DD).')
+
+    args = parser.parse_args()
+    main(args.backfill, args.since)
 
 
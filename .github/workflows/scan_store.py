@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+import datetime
+import os
+
+# Where the results are kept between runs (restored by the Actions cache)
+DEFAULT_STORE_PATH = os.path.join('.cache', 'scan-results.tsv')
+
+# A result is trusted for this long, after which the repo is scanned again even without a new push
+# (the checks and their templates evolve)
+SCAN_TTL = datetime.timedelta(days=7)
+
+@dataclass
+class ScanRecord:
+    repo_slug: str
+    pushed_at: str  # pushed_at of the repo when it was scanned, as given by the search API
+    scan_date: str  # UTC, ISO 8601
+    outcome: str
+
+class ScanStore:
+    """
+    Outcome of the last scan of each repo, keyed by owner/repo and the time of the push that was scanned.
+    Serialised as one tab-separated line per repo: slug, pushed_at, scan date and outcome.
+    """
+
+    def __init__(self, records=()):
+        self.records = {record.repo_slug: record for record in records}
+
+    def __len__(self):
+        return len(self.records)
+
+    def get(self, repo_slug):
+        return self.records.get(repo_slug)
+
+    def is_fresh(self, repo_slug, pushed_at, now=None):
+        """True if the repo was scanned since its last push (pushed_at) less than SCAN_TTL ago."""
+        record = self.records.get(repo_slug)
+        if record is None or pushed_at is None or record.pushed_at != pushed_at:
+            return False
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        return now - datetime.datetime.fromisoformat(record.scan_date) < SCAN_TTL
+
+    def record(self, repo_slug, pushed_at, outcome, now=None):
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        self.records[repo_slug] = ScanRecord(repo_slug, pushed_at, now.replace(microsecond=0).isoformat(), outcome)
+
+    def prune(self, now=None):
+        """Forget the results older than SCAN_TTL."""
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        self.records = {
+            slug: record for slug, record in self.records.items()
+            if now - datetime.datetime.fromisoformat(record.scan_date) < SCAN_TTL
+        }
+
+    def save(self, path=DEFAULT_STORE_PATH):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            for slug in sorted(self.records):
+                record = self.records[slug]
+                file.write(f"{record.repo_slug}\t{record.pushed_at}\t{record.scan_date}\t{record.outcome}\n")
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_STORE_PATH):
+        """Read a store written by save(), or return an empty store if there is none."""
+        if not os.path.exists(path):
+            return cls()
+        records = []
+        with open(path, 'r', encoding='utf-8') as file:
+            for line in file:
+                fields = line.rstrip('\n').split('\t')
+                if len(fields) == 4:
+                    records.append(ScanRecord(*fields))
+        return cls(records)
@@ -0,0 +1,70 @@
+import datetime
+import json
+import os
+
+# Where the cursor is kept between runs (restored by the Actions cache)
+DEFAULT_CURSOR_PATH = os.path.join('.cache', 'search-cursor.json')
+
+# The search index lags behind pushes: each run looks this far behind the high-water mark
+# and relies on the seen set to skip the repos already analysed.
+OVERLAP = datetime.timedelta(hours=6)
+
+# How far back the first run looks when there is no cursor yet
+DEFAULT_LOOKBACK = datetime.timedelta(days=7)
+
+def parse_timestamp(value):
+    return datetime.datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=datetime.timezone.utc)
+
+class SearchCursor:
+    """
+    Where the previous scans stopped in the search results.
+
+    The high-water mark is the (pushed_at, id) of the most recent repo processed by a completed run.
+    The seen set maps the id of every repo processed near the mark to the pushed_at it had,
+    so that a repo only comes back when it was pushed again.
+    """
+
+    def __init__(self, pushed_at=None, repo_id=None, seen=None):
+        self.pushed_at = pushed_at
+        self.repo_id = repo_id
+        self.seen = {int(repo_id): value for repo_id, value in (seen or {}).items()}
+
+    def start(self, now=None):
+        """Lower bound of the pushed: range to search."""
+        if self.pushed_at is None:
+            now = now or datetime.datetime.now(datetime.timezone.utc)
+            return now.replace(microsecond=0) - DEFAULT_LOOKBACK
+        return parse_timestamp(self.pushed_at) - OVERLAP
+
+    def is_new(self, repo):
+        """True if the repo was not processed since it was last pushed."""
+        return self.seen.get(repo['id']) != repo['pushed_at']
+
+    def mark_seen(self, repo):
+        self.seen[repo['id']] = repo['pushed_at']
+
+    def complete(self):
+        """Move the high-water mark to the most recent repo seen and forget the repos far behind it."""
+        if not self.seen:
+            return
+        self.pushed_at, self.repo_id = max((pushed_at, repo_id) for repo_id, pushed_at in self.seen.items())
+        horizon = (parse_timestamp(self.pushed_at) - OVERLAP).strftime('%Y-%m-%dT%H:%M:%SZ')
+        self.seen = {repo_id: pushed_at for repo_id, pushed_at in self.seen.items() if pushed_at >= horizon}
+
+    def save(self, path=DEFAULT_CURSOR_PATH):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({'pushed_at': self.pushed_at, 'repo_id': self.repo_id, 'seen': self.seen}, file, indent=1)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_CURSOR_PATH):
+        """Read a cursor written by save(), or return an empty cursor if there is none."""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        return cls(data.get('pushed_at'), data.get('repo_id'), data.get('seen'))
@@ -19,6 +19,9 @@ def unique_folder(user_name, repo_name):
 def repo_path(user_name, repo_name):
     return os.path.join(SUBFOLDERNAME, unique_folder(user_name, repo_name))
 
+# Text characters (same logic as file(1)), anything else makes a file binary
+TEXTCHARS = bytes(bytearray({7,8,9,10,12,13,27} | set(range(0x20, 0x100)) - {0x7f}))
+
 # REF: https://stackoverflow.com/a/7392391/5958842
 def is_binary_file(path, blocksize=1024):
     """
@@ -32,15 +35,12 @@ def is_binary_file(path, blocksize=1024):
         bool: True if binary, False if text.
     """
 
-    # Define text characters (same logic as file(1))
-    textchars = bytearray({7,8,9,10,12,13,27} | set(range(0x20, 0x100)) - {0x7f})
-
     if not os.path.isfile(path):
         raise FileNotFoundError(f"No such file: {path}")
     
     with open(path, 'rb') as f:
         chunk = f.read(blocksize)
-    return bool(chunk.translate(None, textchars))
+    return bool(chunk.translate(None, TEXTCHARS))
 
 def get_user_from_title(issue_title):
     """Extract the username from the issue title."""
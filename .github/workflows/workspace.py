@@ -0,0 +1,140 @@
+# Disk budget for the clones kept under repos/
+import json
+import os
+import shutil
+import stat
+import threading
+import time
+
+import utils
+
+# Total size the clones may take before the least recently used ones are removed
+DEFAULT_BUDGET_BYTES = int(os.getenv('REPOS_BUDGET_BYTES', str(4 * 1024 * 1024 * 1024)))
+
+# Bookkeeping of the clones (size and last use), kept next to them so that it follows the Actions cache
+INDEX_FILE = '.workspace.json'
+
+def get_size(path):
+    """Disk usage of a folder, .git included (symbolic links are not followed)."""
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+def remove_tree(path):
+    # Git makes its pack files read-only, which rmtree can't delete on every platform
+    def on_error(function, failing_path, exc_info):
+        os.chmod(failing_path, stat.S_IWRITE)
+        function(failing_path)
+    shutil.rmtree(path, onerror=on_error)
+
+class Workspace:
+    """
+    Leases the checkout folder of each repo under repos/ and keeps their total size under a byte budget.
+
+    A leased folder is in use (being cloned or analysed) and is never evicted. Once released,
+    it is either removed right away or kept for later runs, and the least recently used
+    clones are removed when the budget is exceeded.
+    """
+
+    def __init__(self, root=None, budget=DEFAULT_BUDGET_BYTES, clock=time.time):
+        self.root = root or utils.subfolder_name()
+        self.budget = budget
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.leased = set()
+        self.entries = self._load()
+
+    def _load(self):
+        entries = {}
+        index_path = os.path.join(self.root, INDEX_FILE)
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, 'r', encoding='utf-8') as file:
+                    entries = json.load(file)
+            except (OSError, ValueError) as e:
+                print(f"🟡 Ignoring the workspace index: {e}")
+
+        # Folders restored without bookkeeping are the first to go, folders that disappeared are forgotten
+        folders = set()
+        if os.path.isdir(self.root):
+            folders = {name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name))}
+        for folder in folders - set(entries):
+            entries[folder] = {'size': None, 'last_used': 0}
+        return {folder: entry for folder, entry in entries.items() if folder in folders}
+
+    def folder(self, repo_path):
+        return os.path.basename(os.path.normpath(repo_path))
+
+    def lease(self, repo_path):
+        """Mark the folder of a repo as in use, before it is cloned or updated."""
+        folder = self.folder(repo_path)
+        with self.lock:
+            self.leased.add(folder)
+            entry = self.entries.setdefault(folder, {'size': None, 'last_used': 0})
+            entry['last_used'] = self.clock()
+
+    def release(self, repo_path, keep=True):
+        """Give the folder back. It is removed unless keep is True, then clones are evicted if over budget."""
+        folder = self.folder(repo_path)
+        path = os.path.join(self.root, folder)
+        with self.lock:
+            self.leased.discard(folder)
+            if not keep:
+                self.entries.pop(folder, None)
+        if not keep:
+            if os.path.exists(path):
+                print(f"🧹 Removing {path}, no follow-up needs it")
+                remove_tree(path)
+        elif os.path.exists(path):
+            size = get_size(path)
+            with self.lock:
+                entry = self.entries.setdefault(folder, {'size': None, 'last_used': self.clock()})
+                entry['size'] = size
+        self.evict()
+        self.save()
+
+    def total_size(self):
+        with self.lock:
+            unknown = [folder for folder, entry in self.entries.items() if entry['size'] is None and folder not in self.leased]
+        for folder in unknown:
+            size = get_size(os.path.join(self.root, folder))
+            with self.lock:
+                if folder in self.entries:
+                    self.entries[folder]['size'] = size
+        with self.lock:
+            return sum(entry['size'] or 0 for entry in self.entries.values())
+
+    def evict(self):
+        """Remove the least recently used folders that are not leased until the total size fits the budget."""
+        total = self.total_size()
+        if total <= self.budget:
+            return
+        with self.lock:
+            candidates = sorted((entry['last_used'], folder) for folder, entry in self.entries.items() if folder not in self.leased)
+        for _last_used, folder in candidates:
+            if total <= self.budget:
+                break
+            with self.lock:
+                if folder in self.leased or folder not in self.entries:
+                    continue
+                entry = self.entries.pop(folder)
+            path = os.path.join(self.root, folder)
+            print(f"🧹 Evicting {path} ({entry['size'] or 0} bytes) to stay under the {self.budget} bytes budget")
+            if os.path.exists(path):
+                remove_tree(path)
+            total -= entry['size'] or 0
+
+    def save(self):
+        if not os.path.isdir(self.root):
+            return
+        index_path = os.path.join(self.root, INDEX_FILE)
+        with self.lock:
+            data = json.dumps(self.entries, indent=1)
+        with open(index_path + '.tmp', 'w', encoding='utf-8') as file:
+            file.write(data)
+        os.replace(index_path + '.tmp', index_path)
@@ -0,0 +1,126 @@
+"""Fake GitHub API responses, sessions and clients shared by the unit tests."""
+import json as jsonlib
+
+
+def search_item(language="VBA", stars=0, user="alice"):
+    """A repository as returned by the search API."""
+    return {
+        "id": 1,
+        "name": "repo",
+        "owner": {"login": user},
+        "description": "",
+        "language": language,
+        "html_url": f"https://github.com/{user}/repo",
+        "updated_at": "2024-01-01T00:00:00Z",
+        "pushed_at": "2024-01-01T00:00:00Z",
+        "stargazers_count": stars,
+        "default_branch": "main",
+    }
+
+
+class FakeResponse:
+    """
+    Stands for a requests.Response. The body can be given as a decoded JSON `payload`
+    (the raw content is then its encoding) or as raw `content`.
+    """
+
+    def __init__(self, status_code, payload=None, headers=None, text="", content=None):
+        self.status_code = status_code
+        self.payload = payload
+        self.headers = headers or {}
+        self.text = text
+        self._content = content
+        self.bytes_read = 0
+        self.closed = False
+
+    @property
+    def content(self):
+        if self._content is None:
+            return jsonlib.dumps(self.payload).encode("utf-8") if self.payload is not None else b""
+        return self._content
+
+    def json(self):
+        if self.payload is None and self._content:
+            return jsonlib.loads(self._content)
+        return self.payload
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.content), chunk_size):
+            chunk = self.content[start:start + chunk_size]
+            self.bytes_read += len(chunk)
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    """Stands for a requests.Session, answers with the given responses in order and records (method, url, kwargs)."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        return self.responses.pop(0)
+
+
+class FakeIssuesClient:
+    """
+    Stands for a GitHubClient in front of the issues of one repo, kept in memory
+    and served like the GitHub REST API. New issues are numbered from `next_number`.
+    Set `patch_status` to make the PATCH requests fail with that status code.
+    """
+
+    def __init__(self, issues=(), next_number=None):
+        self.issues = {issue["number"]: issue for issue in issues}
+        self.next_number = next_number if next_number is not None else max(self.issues, default=0) + 1
+        self.gets = []
+        self.patches = []
+        self.created = []
+        self.comments = []
+        self.patch_status = 200
+
+    def _answer(self, number):
+        return dict(self.issues[number], html_url=f"https://github.com/owner/repo/issues/{number}")
+
+    @staticmethod
+    def _parts(path):
+        # /repos/<owner>/<repo>/issues[/<number>[/<labels|comments>[/<label>]]]
+        return path.split("/issues", 1)[1].strip("/").split("/")
+
+    def get(self, path, **kwargs):
+        number = int(self._parts(path)[0])
+        self.gets.append(number)
+        return FakeResponse(200, self._answer(number))
+
+    def post(self, path, json=None):
+        parts = self._parts(path)
+        if parts == [""]:
+            number = self.next_number
+            self.next_number += 1
+            self.issues[number] = {"number": number, "title": json["title"], "body": json["body"],
+                                   "state": "open", "labels": [{"name": name} for name in json.get("labels", [])]}
+            self.created.append(number)
+            return FakeResponse(201, self._answer(number))
+        number = int(parts[0])
+        if parts[1] == "labels":
+            self.issues[number]["labels"].extend({"name": name} for name in json)
+            return FakeResponse(200, self.issues[number]["labels"])
+        self.comments.append((number, json["body"]))
+        return FakeResponse(201, {"id": len(self.comments), "body": json["body"]})
+
+    def patch(self, path, json=None):
+        number = int(self._parts(path)[0])
+        self.patches.append(number)
+        if self.patch_status != 200:
+            return FakeResponse(self.patch_status, {"message": "Server Error"})
+        self.issues[number].update(json)
+        return FakeResponse(200, self._answer(number))
+
+    def delete(self, path, **kwargs):
+        number, _labels, label = self._parts(path)
+        issue = self.issues[int(number)]
+        issue["labels"] = [item for item in issue["labels"] if item["name"] != label]
+        return FakeResponse(200, issue["labels"])
@@ -0,0 +1,120 @@
+"""Tests for the memo of file verdicts keyed by git blob id."""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import types
+import unittest
+
+# Make sure we can import workflow helpers from the workflows directory.
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+WORKFLOWS_DIR = os.path.join(ROOT_DIR, ".github", "workflows")
+if WORKFLOWS_DIR not in sys.path:
+    sys.path.insert(0, WORKFLOWS_DIR)
+
+if "requests" not in sys.modules:
+    sys.modules["requests"] = types.SimpleNamespace()
+
+import gh  # noqa: E402
+import git_ls_parser  # noqa: E402
+from blob_memo import BlobMemo  # noqa: E402
+
+FILES = {
+    "Module1.bas": b"Attribute VB_Name = \"Module1\"\nPublic Sub Main()\nEnd Sub\n",
+    "macro.txt": b"Sub Hello()\nEnd Sub\n",
+    "notes.txt": b"Just some notes\n",
+    "Script": b"Function Run()\nEnd Function\n",
+    "Class1.cls": b"VERSION 1.0 CLASS\nBEGIN\nEND\nAttribute VB_Name = \"Class1\"\n",
+    "Form1.frm": b"VERSION 5.00\n\nBegin VB.Form Form1\nEnd\n",
+}
+
+
+def _git(*args, cwd):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+
+class BlobMemoTests(unittest.TestCase):
+    def test_least_recently_used_blobs_are_dropped(self):
+        memo = BlobMemo(max_entries=2)
+        memo.set("a", "vba", True)
+        memo.set("b", "vba", False)
+        self.assertTrue(memo.get("a", "vba"))
+
+        memo.set("c", "binary", True)
+
+        self.assertIsNone(memo.get("b", "vba"))
+        self.assertIsNone(memo.get("a", "binary"))
+        self.assertEqual(memo.verdict("a", "vba", lambda: self.fail("The verdict is known")), True)
+        self.assertEqual(memo.verdict("c", "vba", lambda: False), False)
+        self.assertEqual(memo.entries["c"], {"binary": True, "vba": False})
+
+    def test_round_trip(self):
+        memo = BlobMemo()
+        memo.set("abc", "double_lf", False)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "cache", "blob-verdicts.json")
+            memo.save(path)
+            loaded = BlobMemo.load(path)
+
+        self.assertEqual(loaded.get("abc", "double_lf"), False)
+        self.assertEqual(len(BlobMemo.load(path)), 0)
+
+
+@unittest.skipIf(shutil.which("git") is None, "git is not available")
+class MemoizedClassificationTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        for module, name in ((gh, "blob_memo"), (gh, "is_vba_file"), (gh, "has_vba_class_header"), (gh, "has_double_lf_header")):
+            self.addCleanup(setattr, module, name, getattr(module, name))
+        gh.blob_memo = BlobMemo()
+
+    def _repo(self, name, files, attributes=None):
+        path = os.path.join(self.directory.name, name)
+        os.makedirs(path)
+        if attributes:
+            files = dict(files, **{".gitattributes": attributes})
+        for file, content in files.items():
+            with open(os.path.join(path, file), "wb") as handle:
+                handle.write(content)
+        _git("init", "--quiet", cwd=path)
+        _git("add", "-A", cwd=path)
+        return path
+
+    def test_fork_is_classified_from_the_memo(self):
+        original = self._repo("original", FILES)
+        counts = gh.count_vba_related_files(original, workers=1)
+
+        fork = self._repo("fork", FILES)
+        gh.is_vba_file = lambda file_path: self.fail("The verdict should come from the memo")
+
+        self.assertEqual(gh.count_vba_related_files(fork, workers=1), counts)
+        self.assertEqual(counts[".txt"], 1)
+        self.assertEqual(counts["No ext"], 1)
+
+    def test_check_g_header_checks_come_from_the_memo(self):
+        def problematic_files(repo_path):
+            lines = _git("ls-files", "--eol", "--", "*.frm", "*.cls", cwd=repo_path).splitlines()
+            return gh.get_problematic_files_check_g(git_ls_parser.parse_git_ls_files_output(lines), repo_path)
+
+        expected = problematic_files(self._repo("original", FILES))
+
+        gh.has_vba_class_header = lambda file_path: self.fail("The verdict should come from the memo")
+        gh.has_double_lf_header = lambda file_path: self.fail("The verdict should come from the memo")
+
+        self.assertEqual(problematic_files(self._repo("fork", FILES)), expected)
+        self.assertEqual(expected, ["Class1.cls"])
+
+    def test_files_converted_on_checkout_are_not_memoized(self):
+        repo = self._repo("repo", FILES, attributes=b"*.cls eol=crlf\n*.txt filter=lfs\n")
+
+        blob_ids = gh.get_blob_ids(repo, ["Class1.cls", "Form1.frm", "macro.txt", "Script"])
+
+        self.assertEqual(sorted(blob_ids), ["Form1.frm", "Script"])
+        self.assertEqual(blob_ids["Script"], _git("hash-object", "Script", cwd=repo).strip())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""Unit tests for the planning stage that decides whether a repo needs to be cloned."""
+import os
+import sys
+import types
+import unittest
+
+# Make sure we can import workflow helpers from the workflows directory.
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+WORKFLOWS_DIR = os.path.join(ROOT_DIR, ".github", "workflows")
+if WORKFLOWS_DIR not in sys.path:
+    sys.path.insert(0, WORKFLOWS_DIR)
+
+if "requests" not in sys.modules:
+    sys.modules["requests"] = types.SimpleNamespace()
+
+import gh  # noqa: E402
+import issue_snapshot  # noqa: E402
+import scan_and_suggest  # noqa: E402
+from tests.fakes import search_item  # noqa: E402
+
+
+class PlanChecksTests(unittest.TestCase):
+    def test_checks_follow_language_and_stars(self):
+        threshold = scan_and_suggest.stars_threshold_vba_repo
+        self.assertEqual(scan_and_suggest.plan_checks(search_item("VBA", threshold)), ["Check E", "Check F", "Check G"])
+        self.assertEqual(scan_and_suggest.plan_checks(search_item("VBA", threshold - 1)), [])
+        self.assertEqual(scan_and_suggest.plan_checks(search_item("Visual Basic .NET")), ["Check A"])
+        self.assertEqual(scan_and_suggest.plan_checks(search_item("VBScript")), ["Check B"])
+        self.assertIn("Check C", scan_and_suggest.plan_checks(search_item(None)))
+        self.assertEqual(scan_and_suggest.plan_checks(search_item("Python", 100)), [])
+
+
+class AnalyzeRepoTests(unittest.TestCase):
+    def setUp(self):
+        for module, name in ((gh, "clone_repo"), (gh, "remote_folder_exists"), (gh, "queue_issue_body_append"),
+                             (scan_and_suggest, "issue_snapshot")):
+            self.addCleanup(setattr, module, name, getattr(module, name))
+
+        self.clones = []
+        self.queued = []
+        gh.clone_repo = lambda url: self.clones.append(url)
+        gh.queue_issue_body_append = lambda slug, number, content: self.queued.append(number)
+        scan_and_suggest.issue_snapshot = issue_snapshot.IssueSnapshot()
+
+    def test_repo_without_applicable_check_is_not_cloned(self):
+        gh.remote_folder_exists = lambda token, slug, folder: False
+
+        scan_and_suggest.analyze_repo("token", search_item("VBA", 0), set())
+
+        self.assertEqual(self.clones, [])
+        self.assertEqual(self.queued, [])
+
+    def test_xvba_modules_folder_is_found_without_cloning(self):
+        gh.remote_folder_exists = lambda token, slug, folder: slug == "alice/repo" and folder == "xvba_modules"
+
+        scan_and_suggest.analyze_repo("token", search_item("TypeScript", 5), set())
+
+        self.assertEqual(self.clones, [])
+        self.assertEqual(self.queued, [1108])
+
+    def test_excluded_user_is_skipped_before_planning(self):
+        gh.remote_folder_exists = lambda token, slug, folder: self.fail("The API should not be called")
+        exclusion = {scan_and_suggest.get_username_sha256("alice")}
+
+        scan_and_suggest.analyze_repo("token", search_item("Python"), exclusion)
+
+        self.assertEqual(self.clones, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
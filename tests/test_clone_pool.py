@@ -0,0 +1,97 @@
+"""Unit tests for the pool cloning repos ahead of their analysis."""
+import os
+import sys
+import threading
+import types
+import unittest
+
+# Make sure we can import workflow helpers from the workflows directory.
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+WORKFLOWS_DIR = os.path.join(ROOT_DIR, ".github", "workflows")
+if WORKFLOWS_DIR not in sys.path:
+    sys.path.insert(0, WORKFLOWS_DIR)
+
+if "requests" not in sys.modules:
+    sys.modules["requests"] = types.SimpleNamespace()
+
+from clone_pool import ClonePool  # noqa: E402
+
+
+class _FakeClone:
+    """Records the clones and how many of them ran at the same time."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.cloned = []
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+        self.release = threading.Event()
+
+    def __call__(self, url):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        self.release.wait(1)
+        with self.lock:
+            self.running -= 1
+            self.cloned.append(url)
+        if url in self.failing:
+            raise ValueError("Git clone failed with exit code 128")
+        return True
+
+
+def _url(i):
+    return f"https://github.com/user/repo{i}"
+
+
+class ClonePoolTests(unittest.TestCase):
+    def test_items_keep_their_order_and_clones_run_ahead(self):
+        clone = _FakeClone()
+        clone.release.set()
+        seen = []
+
+        with ClonePool(clone, workers=2, interval=0) as pool:
+            for i in pool.iterate(range(6), lambda i: _url(i) if i % 2 == 0 else None):
+                seen.append(i)
+                if i % 2 == 0:
+                    self.assertTrue(pool.wait(_url(i)))
+
+        self.assertEqual(seen, list(range(6)))
+        self.assertEqual(sorted(clone.cloned), [_url(0), _url(2), _url(4)])
+
+    def test_lookahead_bounds_the_clones_started(self):
+        clone = _FakeClone()
+        clone.release.set()
+
+        with ClonePool(clone, workers=1, interval=0) as pool:
+            iterator = pool.iterate(range(10), _url, lookahead=3)
+            next(iterator)
+            self.assertEqual(set(pool.futures), {_url(0), _url(1), _url(2)})
+
+    def test_clones_per_host_are_limited(self):
+        clone = _FakeClone()
+
+        with ClonePool(clone, workers=4, per_host=2, interval=0) as pool:
+            for i in range(4):
+                pool.submit(_url(i))
+            threading.Timer(0.1, clone.release.set).start()
+            for i in range(4):
+                pool.wait(_url(i))
+
+        self.assertEqual(clone.max_running, 2)
+
+    def test_clone_error_is_raised_by_wait(self):
+        clone = _FakeClone(failing=[_url(1)])
+        clone.release.set()
+
+        with ClonePool(clone, interval=0) as pool:
+            pool.submit(_url(1))
+            with self.assertRaises(ValueError):
+                pool.wait(_url(1))
+            # Not submitted beforehand: cloned on the spot
+            self.assertTrue(pool.wait(_url(2)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -18,6 +18,9 @@ import scan_and_suggest  # noqa: E402
 
 
 class ClosedIssueTitleMatchTests(unittest.TestCase):
+    def setUp(self):
+        gh.reset_issue_caches()
+
     def test_returns_true_for_exact_title_match_in_closed_issues(self):
         original_get_all_issues = gh.get_all_issues
 
@@ -40,8 +43,41 @@ class ClosedIssueTitleMatchTests(unittest.TestCase):
         finally:
             gh.get_all_issues = original_get_all_issues
 
+    def test_closed_issues_are_fetched_once_per_run(self):
+        original_get_all_issues = gh.get_all_issues
+        fetches = []
+
+        def _fake_get_all_issues(*args, **kwargs):
+            fetches.append((args, kwargs))
+            return [{"number": 17, "title": "[user/repo] is missing a .gitattributes file", "state": "closed"}]
+
+        try:
+            gh.get_all_issues = _fake_get_all_issues
+
+            self.assertTrue(gh.has_closed_issue_with_exact_title("token", "owner/repo", "[user/repo] is missing a .gitattributes file"))
+            self.assertFalse(gh.has_closed_issue_with_exact_title("token", "owner/repo", "[user/other] is missing a .gitattributes file"))
+            self.assertEqual(len(fetches), 1)
+        finally:
+            gh.get_all_issues = original_get_all_issues
+
+    def test_issue_closed_during_the_run_is_indexed(self):
+        original_get_all_issues = gh.get_all_issues
+
+        try:
+            gh.get_all_issues = lambda *_args, **_kwargs: []
+            title = "[user/repo] is detected as VBScript"
+
+            self.assertFalse(gh.has_closed_issue_with_exact_title("token", "owner/repo", title))
+            gh.record_issue("owner/repo", {"number": 3, "title": title, "state": "closed"})
+            self.assertTrue(gh.has_closed_issue_with_exact_title("token", "owner/repo", title))
+        finally:
+            gh.get_all_issues = original_get_all_issues
+
 
 class CreateIssueWrapperClosedTitleTests(unittest.TestCase):
+    def setUp(self):
+        gh.reset_issue_caches()
+
     def test_create_issue_wrapper_skips_when_matching_closed_issue_exists(self):
         original_env = os.environ.get("GITHUB_REPOSITORY")
         original_has_closed_issue = scan_and_suggest.gh.has_closed_issue_with_exact_title
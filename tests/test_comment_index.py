@@ -0,0 +1,56 @@
+"""Unit tests for the per-issue comment index behind already_commented."""
+import os
+import sys
+import types
+import unittest
+
+# Make sure we can import workflow helpers from the workflows directory.
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+WORKFLOWS_DIR = os.path.join(ROOT_DIR, ".github", "workflows")
+if WORKFLOWS_DIR not in sys.path:
+    sys.path.insert(0, WORKFLOWS_DIR)
+
+if "requests" not in sys.modules:
+    sys.modules["requests"] = types.SimpleNamespace()
+
+import gh  # noqa: E402
+from tests.fakes import FakeIssuesClient  # noqa: E402
+
+
+class CommentIndexTests(unittest.TestCase):
+    def setUp(self):
+        gh.reset_issue_caches()
+        self.addCleanup(gh.reset_issue_caches)
+        original_get_paginated = gh.get_paginated
+        original_get_client = gh.get_client
+        self.addCleanup(setattr, gh, "get_paginated", original_get_paginated)
+        self.addCleanup(setattr, gh, "get_client", original_get_client)
+
+        self.listings = []
+
+        def _fake_get_paginated(token, path, params=None, per_page=100, what="items"):
+            self.listings.append(path)
+            # Marker beyond the first 30 comments (the default page size of the API)
+            return [{"body": f"comment {i}"} for i in range(45)] + [{"body": "Is this intentional? [SubCheck AA]"}]
+
+        gh.get_paginated = _fake_get_paginated
+        self.client = FakeIssuesClient()
+        gh.get_client = lambda _token=None: self.client
+
+    def test_markers_are_answered_from_one_listing(self):
+        self.assertTrue(gh.already_commented("token", "owner/repo", 5, "[SubCheck AA]"))
+        self.assertFalse(gh.already_commented("token", "owner/repo", 5, "[SubCheck AB]"))
+        self.assertFalse(gh.already_commented("token", "owner/repo", "5", "[SubCheck EA]"))
+        self.assertEqual(self.listings, ["/repos/owner/repo/issues/5/comments"])
+
+    def test_posted_comment_is_added_to_the_index(self):
+        self.assertFalse(gh.already_commented("token", "owner/repo", 5, "[SubCheck BA]"))
+
+        gh.create_comment("token", "owner/repo", 5, "Still .vbs files? [SubCheck BA]")
+
+        self.assertTrue(gh.already_commented("token", "owner/repo", 5, "[SubCheck BA]"))
+        self.assertEqual(len(self.listings), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
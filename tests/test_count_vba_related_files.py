@@ -0,0 +1,224 @@
+"""Tests for the single-pass classifier behind count_vba_related_files."""
+import contextlib
+import importlib.machinery
+import io
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import types
+import unittest
+
+# Make sure we can import workflow helpers from the workflows directory.
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+WORKFLOWS_DIR = os.path.join(ROOT_DIR, ".github", "workflows")
+if WORKFLOWS_DIR not in sys.path:
+    sys.path.insert(0, WORKFLOWS_DIR)
+
+if "requests" not in sys.modules:
+    sys.modules["requests"] = types.SimpleNamespace()
+
+import file_inventory  # noqa: E402
+import gh  # noqa: E402
+import utils  # noqa: E402
+
+VBA = b"Attribute VB_Name = \"Module1\"\nPublic Sub Main()\nEnd Sub\n"
+TEXT = b"Just some notes\n"
+BINARY = b"PK\x03\x04" + bytes(range(256)) * 8
+
+FILES = {
+    "Module1.bas": VBA,
+    "Class1.cls": TEXT,
+    "forms.v2/Form1.frm": TEXT,
+    "src/Program.vb": TEXT,
+    "src/Types.d.vb": TEXT,
+    "src/Project.vbproj": TEXT,
+    "src/macro.vbs": VBA,
+    "src/other.vbs": TEXT,
+    "notes.txt": TEXT,
+    "code.txt": VBA,
+    "Macro": VBA,
+    "README": TEXT,
+    "My No ext": TEXT,
+    "trailing.": VBA,
+    ".bas": TEXT,
+    "UPPER.BAS": TEXT,
+    "Book.xlsm": BINARY,
+    "Fake.xlsm": TEXT,
+    "deep/a/b/c/Deep.bas": TEXT,
+    "deep/.git/Ignored.bas": TEXT,
+    ".git/config.bas": TEXT,
+    "image.png": BINARY,
+}
+
+
+def _reference_counts(repo_path):
+    """The os.walk and per-extension loop that count_vba_related_files used before."""
+    counts = {ext: 0 for ext in gh.get_vba_extensions()}
+    for root, dirs, files in os.walk(repo_path):
+        dirs[:] = [d for d in dirs if d != ".git"]
+        for file in files:
+            file_path = os.path.join(root, file)
+            if os.path.islink(file_path):
+                continue
+            for ext in counts:
+                if ext == ".txt" or ext == ".vbs":
+                    if file.endswith(ext) and gh.is_vba_file(file_path):
+                        counts[ext] += 1
+                    continue
+                if ext in utils.office_vba_extensions:
+                    if file.endswith(ext) and utils.is_binary_file(file_path):
+                        counts[ext] += 1
+                    continue
+                if file.endswith(ext):
+                    counts[ext] += 1
+                    continue
+                if ext == "No ext" and "." not in file:
+                    if gh.is_vba_file(file_path):
+                        counts[ext] += 1
+    return counts
+
+
+@unittest.skipIf(shutil.which("git") is None, "git is not available")
+class CountVbaRelatedFilesTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.repo_path = self.directory.name
+        for path, content in FILES.items():
+            full_path = os.path.join(self.repo_path, *path.split("/"))
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, "wb") as file:
+                file.write(content)
+        if hasattr(os, "symlink"):
+            try:
+                os.symlink(os.path.join(self.repo_path, "Module1.bas"), os.path.join(self.repo_path, "Link.bas"))
+                os.symlink(os.path.join(self.repo_path, "src"), os.path.join(self.repo_path, "linked-src"))
+            except OSError:
+                pass
+        subprocess.run(["git", "init", "--quiet"], cwd=self.repo_path, check=True)
+        subprocess.run(["git", "add", "-A"], cwd=self.repo_path, check=True)
+
+    def test_counts_match_the_previous_algorithm(self):
+        counts = gh.count_vba_related_files(self.repo_path)
+
+        self.assertEqual(counts, _reference_counts(self.repo_path))
+        self.assertEqual(counts[".bas"], 3)
+        self.assertEqual(counts[".vb"], 2)
+        self.assertEqual(counts[".d.vb"], 1)
+        self.assertEqual(counts[".vbs"], 1)
+        self.assertEqual(counts[".txt"], 1)
+        self.assertEqual(counts["No ext"], 2)
+        self.assertEqual(counts[".xlsm"], 1)
+
+    def test_untracked_files_are_not_counted(self):
+        before = gh.count_vba_related_files(self.repo_path)
+        with open(os.path.join(self.repo_path, "Untracked.bas"), "wb") as file:
+            file.write(VBA)
+
+        self.assertEqual(gh.count_vba_related_files(self.repo_path), before)
+        self.assertFalse(gh.is_repo_empty(self.repo_path))
+
+    @unittest.skipIf(sys.platform == "win32", "file names can't contain tabs on Windows")
+    def test_path_with_a_tab_is_listed(self):
+        for name in ("Tab\tModule.bas", "Tab\tdir/Form\t1.frm"):
+            full_path = os.path.join(self.repo_path, *name.split("/"))
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, "wb") as file:
+                file.write(TEXT)
+        subprocess.run(["git", "add", "-A"], cwd=self.repo_path, check=True)
+
+        full = file_inventory.FileInventory.load(self.repo_path, sparse=False, eol_pathspecs=None)
+        sparse = file_inventory.FileInventory.load(self.repo_path, sparse=True, eol_pathspecs=["*.frm"])
+
+        for inventory in (full, sparse):
+            self.assertIn("Tab\tModule.bas", inventory.by_path)
+            self.assertEqual(inventory.by_path["Tab\tModule.bas"].mode, "100644")
+        self.assertTrue(full.by_path["Tab\tdir/Form\t1.frm"].eol_info.startswith("i/lf"))
+        self.assertIsNone(sparse.by_path["Tab\tdir/Form\t1.frm"].eol_info)
+        self.assertIn("Tab\tdir/Form\t1.frm", [entry.path for entry in sparse.eol_entries()])
+        self.assertEqual(gh.count_vba_related_files(self.repo_path)[".bas"], 4)
+
+    def test_parallel_mode_matches_the_serial_counts(self):
+        serial = gh.count_vba_related_files(self.repo_path, workers=1)
+
+        # Workers started from a fresh interpreter would import the real requests package,
+        # the test forks them so that they inherit its stub
+        self.assertNotEqual(gh.get_worker_context().get_start_method(), "fork")
+        self.addCleanup(setattr, gh, "get_worker_context", gh.get_worker_context)
+        gh.get_worker_context = lambda: multiprocessing.get_context("fork")
+
+        self.assertEqual(gh.count_vba_related_files(self.repo_path, workers=2, threshold=0), serial)
+
+    @unittest.skipUnless(importlib.machinery.PathFinder.find_spec("requests"), "the worker processes import gh, which needs requests")
+    def test_worker_processes_return_the_serial_counts(self):
+        serial = gh.count_vba_related_files(self.repo_path, workers=1)
+
+        # Round trip through real forkserver (or spawn) workers, without the thread pool fallback
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            parallel = gh.count_vba_related_files(self.repo_path, workers=2, threshold=0)
+
+        self.assertIn("with 2 worker processes", output.getvalue())
+        self.assertNotIn("Process pool unavailable", output.getvalue())
+        self.assertEqual(parallel, serial)
+
+    def test_content_is_only_read_when_the_extension_needs_it(self):
+        probed = []
+        counts = {ext: 0 for ext in gh.get_vba_extensions()}
+
+        for name in ("Module1.bas", "Types.d.vb", "image.png", "trailing.", "Macro", "Book.xlsm"):
+            gh.count_file(counts, name, lambda name=name: probed.append(name) or True,
+                          lambda name=name: probed.append(name) or True)
+
+        self.assertEqual(probed, ["Macro", "Book.xlsm"])
+        self.assertEqual(counts[".vb"], 1)
+        self.assertEqual(counts[".d.vb"], 1)
+
+
+class IsVbaFileTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def _file(self, content):
+        path = os.path.join(self.directory.name, "file.txt")
+        with open(path, "wb") as file:
+            file.write(content)
+        return path
+
+    def _read_whole_file(self, path):
+        with open(path, "r", encoding="cp1252", errors="ignore") as file:
+            return gh.has_vba_code(file.read())
+
+    def test_declaration_split_between_chunks_is_found(self):
+        contents = [
+            b"' header\r\nPublic Function Add(a, b)\r\nEnd Function\r\n",
+            b"x = 1\rPrivate   Sub Hidden()\r",
+            b"Public\n\n  Sub Later()\n",
+            b"Sub",
+            b"Dim SubTotal\nFunctionality = 2\n",
+            b"caf\xe9 \x81\n\tSub Accents()\n",
+        ]
+        for content in contents:
+            path = self._file(content)
+            for chunk_size in (1, 2, 3, 5, 64):
+                with self.subTest(content=content, chunk_size=chunk_size):
+                    self.assertEqual(gh.is_vba_file(path, chunk_size=chunk_size), self._read_whole_file(path))
+
+    def test_reading_stops_at_the_byte_cap(self):
+        path = self._file(b"x = 1\n" * 100 + b"Sub Late()\n")
+
+        self.assertFalse(gh.is_vba_file(path, max_bytes=600, chunk_size=64))
+        self.assertTrue(gh.is_vba_file(path, max_bytes=700, chunk_size=64))
+
+    def test_binary_file_is_rejected(self):
+        path = self._file(b"\x00\x01\x02\nSub Main()\n")
+
+        self.assertFalse(gh.is_vba_file(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
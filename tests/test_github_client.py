@@ -0,0 +1,130 @@
+"""Unit tests for the shared GitHub API client."""
+import os
+import sys
+import types
+import unittest
+
+# Make sure we can import workflow helpers from the workflows directory.
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+WORKFLOWS_DIR = os.path.join(ROOT_DIR, ".github", "workflows")
+if WORKFLOWS_DIR not in sys.path:
+    sys.path.insert(0, WORKFLOWS_DIR)
+
+if "requests" not in sys.modules:
+    sys.modules["requests"] = types.SimpleNamespace()
+
+import github_client  # noqa: E402
+import rate_limit  # noqa: E402
+from tests.fakes import FakeResponse, FakeSession  # noqa: E402
+
+
+class _FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _client_with(responses, clock):
+    limiter = rate_limit.RateLimiter(sleep=clock.sleep, clock=clock.time)
+    client = github_client.GitHubClient("token", limiter=limiter)
+    client._session = FakeSession(responses)
+    return client
+
+
+class GitHubClientTests(unittest.TestCase):
+    def test_get_client_returns_same_instance_per_token(self):
+        self.assertIs(github_client.get_client("token-a"), github_client.get_client("token-a"))
+        self.assertIsNot(github_client.get_client("token-a"), github_client.get_client("token-b"))
+
+    def test_url_resolves_relative_paths_against_api_root(self):
+        client = github_client.GitHubClient("token")
+        self.assertEqual(client.url("/repos/user/repo"), "https://api.github.com/repos/user/repo")
+        self.assertEqual(client.url("repos/user/repo"), "https://api.github.com/repos/user/repo")
+        self.assertEqual(client.url("https://example.test/x"), "https://example.test/x")
+
+    def test_default_headers_include_token_only_when_provided(self):
+        self.assertEqual(github_client.GitHubClient("abc").headers["Authorization"], "token abc")
+        self.assertNotIn("Authorization", github_client.GitHubClient().headers)
+
+
+class RateLimitTests(unittest.TestCase):
+    def test_retry_after_header_is_honoured(self):
+        clock = _FakeClock()
+        client = _client_with([FakeResponse(429, headers={"Retry-After": "7"}), FakeResponse(200)], clock)
+
+        response = client.get("/repos/owner/repo/issues")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(clock.sleeps, [7.0])
+        self.assertEqual(len(client._session.calls), 2)
+
+    def test_exhausted_primary_limit_waits_until_reset(self):
+        clock = _FakeClock()
+        client = _client_with([
+            FakeResponse(403, headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1060"}),
+            FakeResponse(200),
+        ], clock)
+
+        response = client.get("/repos/owner/repo/issues")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(clock.sleeps, [61.0])
+
+    def test_permission_error_is_not_retried(self):
+        clock = _FakeClock()
+        client = _client_with([FakeResponse(403, text='{"message": "Resource not accessible"}')], clock)
+
+        self.assertEqual(client.get("/repos/owner/repo/issues").status_code, 403)
+        self.assertEqual(clock.sleeps, [])
+
+    def test_secondary_limit_backs_off_at_least_half_a_minute(self):
+        clock = _FakeClock()
+        client = _client_with([
+            FakeResponse(403, text='{"message": "You have exceeded a secondary rate limit"}'),
+            FakeResponse(201),
+        ], clock)
+
+        self.assertEqual(client.post("/repos/owner/repo/issues", json={}).status_code, 201)
+        self.assertEqual(len(clock.sleeps), 1)
+        self.assertGreaterEqual(clock.sleeps[0], rate_limit.SECONDARY_BACKOFF / 2)
+
+    def test_gives_up_after_max_retries(self):
+        clock = _FakeClock()
+        client = _client_with([FakeResponse(502) for _ in range(rate_limit.MAX_RETRIES + 1)], clock)
+
+        self.assertEqual(client.get("/repos/owner/repo").status_code, 502)
+        self.assertEqual(len(clock.sleeps), rate_limit.MAX_RETRIES)
+
+    def test_post_answered_with_a_server_error_is_not_sent_again(self):
+        clock = _FakeClock()
+        client = _client_with([FakeResponse(502), FakeResponse(201)], clock)
+
+        self.assertEqual(client.post("/repos/owner/repo/issues", json={}).status_code, 502)
+        self.assertEqual([(method, url) for method, url, _kwargs in client._session.calls], [("POST", "https://api.github.com/repos/owner/repo/issues")])
+
+    def test_graphql_query_is_retried_after_a_server_error(self):
+        clock = _FakeClock()
+        client = _client_with([FakeResponse(502), FakeResponse(200, {"data": {}})], clock)
+
+        self.assertEqual(client.graphql("query { viewer { login } }"), {"data": {}})
+        self.assertEqual(len(client._session.calls), 2)
+
+    def test_writes_are_spaced_by_the_write_interval(self):
+        clock = _FakeClock()
+        client = _client_with([FakeResponse(201), FakeResponse(201)], clock)
+
+        client.post("/repos/owner/repo/issues/1/comments", json={})
+        client.post("/repos/owner/repo/issues/2/comments", json={})
+
+        self.assertEqual(clock.sleeps, [rate_limit.WRITE_INTERVAL])
+
+
+if __name__ == "__main__":
+    unittest.main()
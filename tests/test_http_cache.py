@@ -0,0 +1,82 @@
+"""Unit tests for the conditional-request HTTP cache."""
+import os
+import sys
+import tempfile
+import types
+import unittest
+
+# Make sure we can import workflow helpers from the workflows directory.
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+WORKFLOWS_DIR = os.path.join(ROOT_DIR, ".github", "workflows")
+if WORKFLOWS_DIR not in sys.path:
+    sys.path.insert(0, WORKFLOWS_DIR)
+
+if "requests" not in sys.modules:
+    sys.modules["requests"] = types.SimpleNamespace()
+
+import github_client  # noqa: E402
+import http_cache  # noqa: E402
+from tests.fakes import FakeResponse, FakeSession  # noqa: E402
+
+
+def _temp_cache(max_bytes=http_cache.DEFAULT_MAX_BYTES):
+    directory = tempfile.TemporaryDirectory()
+    cache = http_cache.HttpCache(os.path.join(directory.name, "cache.sqlite"), max_bytes=max_bytes)
+    return directory, cache
+
+
+class HttpCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.directory, self.cache = _temp_cache(max_bytes=10)
+        self.addCleanup(self.directory.cleanup)
+        self.addCleanup(self.cache.close)
+
+    def test_cache_key_ignores_param_order(self):
+        self.assertEqual(
+            http_cache.cache_key("https://x.test/a", {"state": "all", "page": 1}),
+            http_cache.cache_key("https://x.test/a", {"page": 1, "state": "all"}),
+        )
+
+    def test_validators_use_etag_first(self):
+        self.cache.put("k", b"body", {"ETag": '"abc"', "Last-Modified": "yesterday"})
+        self.assertEqual(self.cache.validators("k"), {"If-None-Match": '"abc"'})
+
+    def test_response_without_validators_is_not_stored(self):
+        self.cache.put("k", b"body", {})
+        self.assertIsNone(self.cache.get("k"))
+
+    def test_least_recently_used_entries_are_evicted_above_budget(self):
+        self.cache.put("old", b"12345", {"ETag": "1"})
+        self.cache.put("new", b"12345", {"ETag": "2"})
+        self.cache.get("old")
+        self.cache.put("newest", b"12345", {"ETag": "3"})
+
+        self.assertIsNotNone(self.cache.get("old"))
+        self.assertIsNone(self.cache.get("new"))
+        self.assertIsNotNone(self.cache.get("newest"))
+
+
+class ClientConditionalRequestTests(unittest.TestCase):
+    def test_not_modified_answer_is_served_from_cache(self):
+        directory, cache = _temp_cache()
+        self.addCleanup(directory.cleanup)
+        self.addCleanup(cache.close)
+
+        client = github_client.GitHubClient("token", cache=cache)
+        client._session = FakeSession([
+            FakeResponse(200, {"number": 1}, {"ETag": '"v1"'}),
+            FakeResponse(304),
+        ])
+
+        first = client.get("/repos/owner/repo/issues/1", cache=True)
+        second = client.get("/repos/owner/repo/issues/1", cache=True)
+
+        self.assertEqual(first.json(), {"number": 1})
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json(), {"number": 1})
+        self.assertNotIn("If-None-Match", client._session.calls[0][2]["headers"])
+        self.assertEqual(client._session.calls[1][2]["headers"]["If-None-Match"], '"v1"')
+
+
+if __name__ == "__main__":
+    unittest.main()
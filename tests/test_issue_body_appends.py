@@ -0,0 +1,86 @@
+"""Unit tests for the buffered appends to the tracking issues (#871, #1108)."""
+import os
+import sys
+import types
+import unittest
+
+# Make sure we can import workflow helpers from the workflows directory.
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+WORKFLOWS_DIR = os.path.join(ROOT_DIR, ".github", "workflows")
+if WORKFLOWS_DIR not in sys.path:
+    sys.path.insert(0, WORKFLOWS_DIR)
+
+if "requests" not in sys.modules:
+    sys.modules["requests"] = types.SimpleNamespace()
+
+import gh  # noqa: E402
+from tests.fakes import FakeIssuesClient  # noqa: E402
+
+
+class IssueBodyAppendTests(unittest.TestCase):
+    def setUp(self):
+        gh.reset_issue_caches()
+        self.addCleanup(gh.reset_issue_caches)
+        self.addCleanup(gh.pending_issue_appends.clear)
+        for name in ("get_client", "get_all_issues", "MAX_ISSUE_BODY_LENGTH"):
+            self.addCleanup(setattr, gh, name, getattr(gh, name))
+
+    def _use(self, repo):
+        gh.get_client = lambda _token=None: repo
+        gh.get_all_issues = lambda *_args, **_kwargs: [dict(issue) for issue in repo.issues.values()]
+
+    def test_buffered_lines_are_deduplicated_and_flushed_in_one_patch(self):
+        repo = FakeIssuesClient([{"number": 871, "title": "Office only", "body": "List:\n 1. https://a\n",
+                           "state": "open", "labels": [{"name": "list"}]}])
+        self._use(repo)
+
+        gh.queue_issue_body_append("owner/repo", 871, " 1. https://a\n")
+        gh.queue_issue_body_append("owner/repo", 871, " 1. https://b\n")
+        gh.queue_issue_body_append("owner/repo", 871, " 1. https://b\n")
+        gh.queue_issue_body_append("owner/repo", 871, " 1. https://c\n")
+        gh.flush_issue_body_appends("token")
+
+        self.assertEqual(repo.issues[871]["body"], "List:\n 1. https://a\n 1. https://b\n 1. https://c\n")
+        self.assertEqual(repo.gets, [871])
+        self.assertEqual(repo.patches, [871])
+        self.assertEqual(gh.pending_issue_appends, {})
+
+    def test_lines_stay_queued_when_the_patch_fails(self):
+        repo = FakeIssuesClient([{"number": 871, "title": "Office only", "body": "List:\n",
+                                  "state": "open", "labels": [{"name": "list"}]}])
+        self._use(repo)
+        repo.patch_status = 502
+
+        gh.queue_issue_body_append("owner/repo", 871, " 1. https://a\n")
+        gh.flush_issue_body_appends("token")
+
+        self.assertEqual(repo.issues[871]["body"], "List:\n")
+        self.assertEqual(gh.pending_issue_appends, {("owner/repo", 871): [" 1. https://a\n"]})
+
+        repo.patch_status = 200
+        gh.flush_issue_body_appends("token")
+
+        self.assertEqual(repo.issues[871]["body"], "List:\n 1. https://a\n")
+        self.assertEqual(gh.pending_issue_appends, {})
+
+    def test_full_body_rolls_over_to_a_continuation_issue(self):
+        gh.MAX_ISSUE_BODY_LENGTH = 40
+        repo = FakeIssuesClient([{"number": 871, "title": "Office only", "body": "List:\n 1. https://a\n",
+                           "state": "open", "labels": [{"name": "list"}]}])
+        self._use(repo)
+
+        gh.append_lines_to_issue_body("token", "owner/repo", 871, [" 1. https://b\n", " 1. https://c\n"])
+
+        self.assertEqual(repo.issues[871]["body"], "List:\n 1. https://a\n 1. https://b\n")
+        self.assertEqual(repo.created, [872])
+        self.assertEqual(repo.issues[872]["title"], "Office only (part 2)")
+        self.assertEqual(repo.issues[872]["labels"], [{"name": "list"}])
+        self.assertTrue(repo.issues[872]["body"].endswith(" 1. https://c\n"))
+
+        # Lines already in a continuation issue are not appended again
+        gh.append_lines_to_issue_body("token", "owner/repo", 871, [" 1. https://c\n"])
+        self.assertEqual(repo.issues[872]["body"].count("https://c"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+"""Unit tests for the run-level issue snapshot."""
+import os
+import sys
+import tempfile
+import types
+import unittest
+
+# Make sure we can import workflow helpers from the workflows directory.
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+WORKFLOWS_DIR = os.path.join(ROOT_DIR, ".github", "workflows")
+if WORKFLOWS_DIR not in sys.path:
+    sys.path.insert(0, WORKFLOWS_DIR)
+
+if "requests" not in sys.modules:
+    sys.modules["requests"] = types.SimpleNamespace()
+
+import gh  # noqa: E402
+import issue_snapshot  # noqa: E402
+import scan_and_suggest  # noqa: E402
+
+
+ISSUES = [
+    {"number": 1, "title": "[alice/repo1] is detected as VBScript", "state": "open", "labels": [{"name": "Check B"}]},
+    {"number": 2, "title": "[bob/repo2] is missing a .gitattributes file", "state": "closed",
+     "closed_at": "2024-01-10T12:00:00Z", "labels": [{"name": "Check G"}]},
+    {"number": 3, "title": "Repos with VBA-enabled Office documents only", "state": "open", "labels": []},
+]
+
+
+class IssueSnapshotTests(unittest.TestCase):
+    def setUp(self):
+        self.snapshot = issue_snapshot.IssueSnapshot.from_api(ISSUES)
+
+    def test_records_are_compact(self):
+        record = self.snapshot.get(1)
+        self.assertEqual(record.user, "alice")
+        self.assertEqual(record.labels, ["Check B"])
+        self.assertIsNone(self.snapshot.get(3).user)
+
+    def test_open_and_closed_views(self):
+        self.assertEqual([r.number for r in self.snapshot.open_issues()], [1, 3])
+        self.assertEqual([r.number for r in self.snapshot.closed_issues()], [2])
+
+    def test_user_lookups(self):
+        self.assertTrue(self.snapshot.has_open_issue_for_user("alice"))
+        self.assertFalse(self.snapshot.has_open_issue_for_user("bob"))
+        self.assertTrue(self.snapshot.has_issue_for_user("bob"))
+        self.assertFalse(self.snapshot.has_issue_for_user("carol"))
+
+    def test_upsert_moves_issue_between_views(self):
+        self.snapshot.upsert({"number": 1, "title": ISSUES[0]["title"], "state": "closed", "labels": []})
+
+        self.assertFalse(self.snapshot.has_open_issue_for_user("alice"))
+        self.assertEqual(self.snapshot.find_closed_by_title(ISSUES[0]["title"]).number, 1)
+
+    def test_reopened_issue_leaves_closed_title_index(self):
+        self.snapshot.upsert({"number": 2, "title": ISSUES[1]["title"], "state": "open", "labels": []})
+
+        self.assertIsNone(self.snapshot.find_closed_by_title(ISSUES[1]["title"]))
+        self.assertTrue(self.snapshot.has_open_issue_for_user("bob"))
+
+    def test_save_and_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "issues.jsonl")
+            self.snapshot.save(path)
+            loaded = issue_snapshot.IssueSnapshot.load(path)
+
+        self.assertEqual(loaded.records, self.snapshot.records)
+        self.assertEqual(loaded.find_closed_by_title(ISSUES[1]["title"]).number, 2)
+
+
+class ScanAndSuggestSnapshotTests(unittest.TestCase):
+    def setUp(self):
+        gh.reset_issue_caches()
+        self.addCleanup(gh.reset_issue_caches)
+
+    def test_all_lookups_share_a_single_listing(self):
+        original_get_all_issues = gh.get_all_issues
+        original_snapshot = scan_and_suggest.issue_snapshot
+        fetches = []
+
+        def _fake_get_all_issues(token, repo_slug, state="all"):
+            fetches.append(state)
+            return ISSUES
+
+        try:
+            gh.get_all_issues = _fake_get_all_issues
+            scan_and_suggest.issue_snapshot = gh.get_issue_snapshot("token", "owner/repo")
+
+            self.assertTrue(scan_and_suggest.already_open_issue_for_user("alice"))
+            self.assertTrue(scan_and_suggest.already_issue_for_user("bob"))
+            self.assertTrue(gh.has_closed_issue_with_exact_title("token", "owner/repo", ISSUES[1]["title"]))
+            self.assertEqual(len(gh.get_all_issues_title("token", "owner/repo")), 3)
+            self.assertEqual(fetches, ["all"])
+        finally:
+            gh.get_all_issues = original_get_all_issues
+            scan_and_suggest.issue_snapshot = original_snapshot
+
+
+class IncrementalSyncTests(unittest.TestCase):
+    def setUp(self):
+        gh.reset_issue_caches()
+        self.addCleanup(gh.reset_issue_caches)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        original_dir = gh.ISSUE_SNAPSHOT_DIR
+        gh.ISSUE_SNAPSHOT_DIR = self.directory.name
+        self.addCleanup(setattr, gh, "ISSUE_SNAPSHOT_DIR", original_dir)
+        original_get_all_issues = gh.get_all_issues
+        self.addCleanup(setattr, gh, "get_all_issues", original_get_all_issues)
+
+    def test_second_run_only_fetches_issues_updated_since_last_sync(self):
+        calls = []
+        first_run = [dict(issue, updated_at="2024-01-0%dT00:00:00Z" % issue["number"]) for issue in ISSUES]
+        second_run = [{"number": 1, "title": ISSUES[0]["title"], "state": "closed", "labels": [],
+                       "updated_at": "2024-02-01T00:00:00Z"}]
+
+        def _fake_get_all_issues(token, repo_slug, state="all", since=None, sort=None):
+            calls.append((state, since, sort))
+            return second_run if since else first_run
+
+        gh.get_all_issues = _fake_get_all_issues
+        gh.get_issue_snapshot("token", "owner/repo", persist=True)
+        gh.reset_issue_caches()
+        snapshot = gh.get_issue_snapshot("token", "owner/repo", persist=True)
+
+        self.assertEqual(calls, [("all", None, None), ("all", "2024-01-03T00:00:00Z", "updated")])
+        self.assertEqual(len(snapshot), 3)
+        self.assertEqual(snapshot.get(1).state, "closed")
+        self.assertEqual(snapshot.last_updated_at(), "2024-02-01T00:00:00Z")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""Unit tests for the concurrent Link-header pager."""
+import os
+import sys
+import threading
+import types
+import unittest
+
+# Make sure we can import workflow helpers from the workflows directory.
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+WORKFLOWS_DIR = os.path.join(ROOT_DIR, ".github", "workflows")
+if WORKFLOWS_DIR not in sys.path:
+    sys.path.insert(0, WORKFLOWS_DIR)
+
+if "requests" not in sys.modules:
+    sys.modules["requests"] = types.SimpleNamespace()
+
+import gh  # noqa: E402
+from tests.fakes import FakeResponse  # noqa: E402
+
+
+class _FakeClient:
+    """Serves `pages` lists of items, with a Link header on the first page if `last` is set."""
+
+    def __init__(self, pages, with_link=True, failing_page=None):
+        self.pages = pages
+        self.with_link = with_link
+        self.failing_page = failing_page
+        self.requested = []
+        self.lock = threading.Lock()
+
+    def get(self, path, params=None, cache=False):
+        page = params["page"]
+        with self.lock:
+            self.requested.append(page)
+        if page == self.failing_page:
+            return FakeResponse(502)
+        headers = {}
+        if page == 1 and self.with_link and len(self.pages) > 1:
+            headers["Link"] = (
+                f'<https://api.github.com/x?per_page=2&page=2>; rel="next", '
+                f'<https://api.github.com/x?per_page=2&page={len(self.pages)}>; rel="last"'
+            )
+        return FakeResponse(200, self.pages[page - 1] if page <= len(self.pages) else [], headers)
+
+
+class PaginationTests(unittest.TestCase):
+    def setUp(self):
+        original_get_client = gh.get_client
+        self.addCleanup(setattr, gh, "get_client", original_get_client)
+
+    def _use(self, client):
+        gh.get_client = lambda _token=None: client
+
+    def test_parse_link_header(self):
+        links = gh.parse_link_header('<https://a.test/?page=2>; rel="next", <https://a.test/?page=9>; rel="last"')
+        self.assertEqual(links, {"next": "https://a.test/?page=2", "last": "https://a.test/?page=9"})
+
+    def test_pages_listed_in_link_header_are_fetched_in_order(self):
+        pages = [[1, 2], [3, 4], [5, 6], [7, 8], [9]]
+        client = _FakeClient(pages)
+        self._use(client)
+
+        items = gh.get_paginated("token", "/x", per_page=2)
+
+        self.assertEqual(items, list(range(1, 10)))
+        self.assertEqual(sorted(client.requested), [1, 2, 3, 4, 5])
+
+    def test_falls_back_to_sequential_paging_without_link_header(self):
+        client = _FakeClient([[1, 2], [3, 4], [5]], with_link=False)
+        self._use(client)
+
+        self.assertEqual(gh.get_paginated("token", "/x", per_page=2), [1, 2, 3, 4, 5])
+        self.assertEqual(client.requested, [1, 2, 3])
+
+    def test_failing_page_raises(self):
+        self._use(_FakeClient([[1, 2], [3, 4], [5]], failing_page=3))
+
+        with self.assertRaises(ValueError):
+            gh.get_paginated("token", "/x", per_page=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""Unit tests for the batched GraphQL repository lookup used by check_for_changes."""
+import os
+import sys
+import types
+import unittest
+
+# Make sure we can import workflow helpers from the workflows directory.
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+WORKFLOWS_DIR = os.path.join(ROOT_DIR, ".github", "workflows")
+if WORKFLOWS_DIR not in sys.path:
+    sys.path.insert(0, WORKFLOWS_DIR)
+
+if "requests" not in sys.modules:
+    sys.modules["requests"] = types.SimpleNamespace()
+
+import check_for_changes  # noqa: E402
+
+
+class _FakeClient:
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.queries = []
+
+    def graphql(self, query, variables=None):
+        self.queries.append((query, variables))
+        return self.answers.pop(0)
+
+
+class RepoInfoBatchTests(unittest.TestCase):
+    def setUp(self):
+        original_get_client = check_for_changes.get_client
+        self.addCleanup(setattr, check_for_changes, "get_client", original_get_client)
+
+    def _use_client(self, client):
+        check_for_changes.get_client = lambda _token=None: client
+
+    def test_resolves_found_renamed_and_missing_repos_in_one_query(self):
+        client = _FakeClient([{
+            "data": {
+                "r0": {
+                    "name": "repo1",
+                    "owner": {"login": "alice"},
+                    "primaryLanguage": {"name": "VBA"},
+                    "pushedAt": "2024-01-01T00:00:00Z",
+                    "defaultBranchRef": {"target": {"oid": "abc123"}},
+                },
+                "r1": {
+                    "name": "new-name",
+                    "owner": {"login": "bob"},
+                    "primaryLanguage": None,
+                    "pushedAt": "2024-01-02T00:00:00Z",
+                    "defaultBranchRef": None,
+                },
+                "r2": None,
+            },
+            "errors": [{"type": "NOT_FOUND", "path": ["r2"], "message": "Could not resolve"}],
+        }])
+        self._use_client(client)
+
+        infos = check_for_changes.get_repos_info_batch("token", [("alice", "repo1"), ("bob", "old-name"), ("carol", "gone")])
+
+        self.assertEqual(len(client.queries), 1)
+        self.assertEqual(infos[("alice", "repo1")]["language"], "VBA")
+        self.assertEqual(infos[("alice", "repo1")]["head_oid"], "abc123")
+        self.assertIsNone(infos[("bob", "old-name")]["language"])
+        # GraphQL doesn't follow transfers, a missing repo is left for the REST lookup to confirm
+        self.assertNotIn(("carol", "gone"), infos)
+
+        rename_info = check_for_changes.detect_repository_rename("bob", "old-name", infos[("bob", "old-name")])
+        self.assertTrue(rename_info["renamed"])
+        self.assertEqual(rename_info["current_name"], "new-name")
+
+    def test_missing_repo_is_only_closed_once_the_rest_api_confirms(self):
+        lookups = []
+        closed = []
+        self.addCleanup(setattr, check_for_changes, "get_repo_info", check_for_changes.get_repo_info)
+        for name in ("close_issue", "write_comment", "add_label_to_issue"):
+            self.addCleanup(setattr, check_for_changes.gh, name, getattr(check_for_changes.gh, name))
+
+        def _get_repo_info(token, user, repo_name):
+            lookups.append((user, repo_name))
+            return {"status_code": 404}
+
+        check_for_changes.get_repo_info = _get_repo_info
+        check_for_changes.gh.close_issue = lambda token, slug, issue, reason: closed.append(issue["number"])
+        check_for_changes.gh.write_comment = lambda *args: None
+        check_for_changes.gh.add_label_to_issue = lambda *args: None
+        issue = {"number": 7, "title": "[carol/gone] is detected as VBScript", "labels": [{"name": "Check B"}]}
+
+        check_for_changes.follow_up_issue("token", "owner/repo", issue, {})
+
+        self.assertEqual(lookups, [("carol", "gone")])
+        self.assertEqual(closed, [7])
+
+    def test_splits_pairs_into_batches(self):
+        client = _FakeClient([{"data": {}}, {"data": {}}, {"data": {}}])
+        self._use_client(client)
+
+        pairs = [("user", f"repo{i}") for i in range(5)]
+        infos = check_for_changes.get_repos_info_batch("token", pairs, batch_size=2)
+
+        self.assertEqual(len(client.queries), 3)
+        self.assertEqual(infos, {})
+        self.assertEqual(client.queries[2][1], {"owner0": "user", "name0": "repo4"})
+
+
+if __name__ == "__main__":
+    unittest.main()
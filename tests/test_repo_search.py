@@ -0,0 +1,90 @@
+"""Unit tests for the date-sliced repository search crawler."""
+import datetime
+import os
+import sys
+import threading
+import types
+import unittest
+
+# Make sure we can import workflow helpers from the workflows directory.
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+WORKFLOWS_DIR = os.path.join(ROOT_DIR, ".github", "workflows")
+if WORKFLOWS_DIR not in sys.path:
+    sys.path.insert(0, WORKFLOWS_DIR)
+
+if "requests" not in sys.modules:
+    sys.modules["requests"] = types.SimpleNamespace()
+
+import repo_search  # noqa: E402
+from tests.fakes import FakeResponse  # noqa: E402
+
+UTC = datetime.timezone.utc
+
+
+class _FakeSearch:
+    """Answers search queries with a pushed: range from a list of (id, pushed) repos, capped like GitHub."""
+
+    def __init__(self, repos, cap):
+        self.repos = repos
+        self.cap = cap
+        self.queries = []
+        self.lock = threading.Lock()
+
+    def get(self, path, params=None, cache=False):
+        with self.lock:
+            self.queries.append((params['q'], params['page']))
+        start, end = params['q'].split("pushed:")[1].split("..")
+        start = datetime.datetime.strptime(start, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=UTC)
+        end = datetime.datetime.strptime(end, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=UTC)
+        matching = sorted((repo for repo in self.repos if start <= repo['pushed'] <= end), key=lambda repo: repo['pushed'], reverse=True)
+        per_page = params['per_page']
+        offset = (params['page'] - 1) * per_page
+        items = matching[:self.cap][offset:offset + per_page]
+        return FakeResponse(200, {"total_count": len(matching), "incomplete_results": False, "items": items})
+
+
+class RepoSearchTests(unittest.TestCase):
+    def setUp(self):
+        original_get_client = repo_search.get_client
+        original_cap = repo_search.SEARCH_RESULT_CAP
+        self.addCleanup(setattr, repo_search, "get_client", original_get_client)
+        self.addCleanup(setattr, repo_search, "SEARCH_RESULT_CAP", original_cap)
+
+        start = datetime.datetime(2024, 1, 1, tzinfo=UTC)
+        self.start = start
+        self.end = start + datetime.timedelta(days=30)
+        self.repos = [{"id": i, "pushed": start + datetime.timedelta(hours=7 * i)} for i in range(100)]
+
+    def _use(self, search):
+        repo_search.get_client = lambda _token=None: search
+
+    def test_windows_are_split_until_under_the_cap(self):
+        repo_search.SEARCH_RESULT_CAP = 20
+        search = _FakeSearch(self.repos, cap=20)
+        self._use(search)
+
+        repos = repo_search.crawl_repos("token", "VBA", self.start, self.end, per_page=5)
+
+        self.assertEqual([repo['id'] for repo in repos], list(range(99, -1, -1)))
+        self.assertTrue(all(query.startswith("VBA pushed:") for query, _page in search.queries))
+
+    def test_small_window_is_fetched_page_by_page(self):
+        search = _FakeSearch(self.repos, cap=1000)
+        self._use(search)
+
+        repos = repo_search.crawl_repos("token", "VBA", self.start, self.end, per_page=30)
+
+        self.assertEqual(len(repos), 100)
+        self.assertEqual(sorted(page for _query, page in search.queries), [1, 2, 3, 4])
+
+    def test_duplicates_are_dropped(self):
+        search = _FakeSearch(self.repos[:3] + self.repos[:1], cap=1000)
+        self._use(search)
+
+        repos = repo_search.crawl_repos("token", "VBA", self.start, self.end)
+
+        self.assertEqual([repo['id'] for repo in repos], [2, 1, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+"""Unit tests for the clone-free analysis backend based on the Git Trees API."""
+import os
+import sys
+import types
+import unittest
+
+# Make sure we can import workflow helpers from the workflows directory.
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+WORKFLOWS_DIR = os.path.join(ROOT_DIR, ".github", "workflows")
+if WORKFLOWS_DIR not in sys.path:
+    sys.path.insert(0, WORKFLOWS_DIR)
+
+if "requests" not in sys.modules:
+    sys.modules["requests"] = types.SimpleNamespace()
+
+import gh  # noqa: E402
+import issue_snapshot  # noqa: E402
+import scan_and_suggest  # noqa: E402
+from tests.fakes import FakeResponse, search_item  # noqa: E402
+
+BLOBS = {
+    "s1": b"Sub Hello()\r\nEnd Sub\r\n",
+    "s2": b"Just some notes\n",
+    "s3": b"Private Function Add(a, b)\nEnd Function\n",
+    "s8": b"# Office files\n*.xlsm binary\nPointer.xlsm filter=lfs diff=lfs merge=lfs -text\n",
+}
+
+TREE = [
+    {"path": "scripts", "type": "tree", "sha": "t1"},
+    {"path": "scripts/hello.vbs", "type": "blob", "mode": "100644", "size": 22, "sha": "s1"},
+    {"path": "scripts/notes.txt", "type": "blob", "mode": "100644", "size": 16, "sha": "s2"},
+    {"path": "scripts/Add", "type": "blob", "mode": "100644", "size": 40, "sha": "s3"},
+    {"path": "scripts/link", "type": "blob", "mode": "120000", "size": 10, "sha": "s4"},
+    {"path": "Book.xlsm", "type": "blob", "mode": "100644", "size": 25000, "sha": "s5"},
+    {"path": "Pointer.xlsm", "type": "blob", "mode": "100644", "size": 130, "sha": "s6"},
+    {"path": "README.md", "type": "blob", "mode": "100644", "size": 900, "sha": "s7"},
+    {"path": ".gitattributes", "type": "blob", "mode": "100644", "size": 70, "sha": "s8"},
+]
+
+
+class _FakeClient:
+    def __init__(self, tree, truncated=False, blobs=BLOBS):
+        self.tree = tree
+        self.truncated = truncated
+        self.blob_contents = blobs
+        self.blobs = []
+        self.responses = []
+
+    def get(self, path, params=None, headers=None, cache=False, stream=False):
+        if "/git/trees/" in path:
+            return FakeResponse(200, {"sha": "root", "tree": self.tree, "truncated": self.truncated})
+        sha = path.rsplit("/", 1)[1]
+        self.blobs.append((sha, headers["Range"]))
+        # The Range header is ignored, like a server that always sends the whole blob
+        response = FakeResponse(200, content=self.blob_contents[sha])
+        self.responses.append(response)
+        return response
+
+
+class RepoTreeTests(unittest.TestCase):
+    def setUp(self):
+        for module, name in ((gh, "get_client"), (gh, "clone_repo"), (gh, "queue_issue_body_append"),
+                             (scan_and_suggest, "issue_snapshot"), (scan_and_suggest, "report_file_extensions_issue")):
+            self.addCleanup(setattr, module, name, getattr(module, name))
+
+        self.clones = []
+        self.queued = []
+        self.reported = []
+        gh.clone_repo = lambda url: self.clones.append(url)
+        gh.queue_issue_body_append = lambda slug, number, content: self.queued.append(number)
+        scan_and_suggest.report_file_extensions_issue = lambda token, repo, counts: self.reported.append(counts)
+        scan_and_suggest.issue_snapshot = issue_snapshot.IssueSnapshot()
+
+    def _use(self, client):
+        gh.get_client = lambda _token=None: client
+
+    def test_counts_from_tree_only_probe_needed_blobs(self):
+        client = _FakeClient(TREE)
+        self._use(client)
+
+        counts = gh.count_vba_related_files_in_tree("token", "alice/repo", gh.get_repo_tree("token", "alice/repo", "main"))
+
+        self.assertEqual(counts[".vbs"], 1)
+        self.assertEqual(counts[".txt"], 0)
+        self.assertEqual(counts["No ext"], 1)
+        self.assertEqual(counts[".xlsm"], 1)
+        self.assertEqual(sorted(sha for sha, _range in client.blobs), ["s1", "s2", "s3", "s8"])
+        self.assertTrue(all(byte_range == f"bytes=0-{gh.VBA_PROBE_MAX_BYTES - 1}" for _sha, byte_range in client.blobs))
+        self.assertTrue(all(response.closed for response in client.responses))
+
+    def test_blob_is_scanned_up_to_the_same_cap_as_a_clone(self):
+        late = b"x = 1\n" * (100 * 1024) + b"Sub Late()\n"
+        huge = b"x = 1\n" * (1024 * 1024)
+        tree = [
+            {"path": "huge.txt", "type": "blob", "mode": "100644", "size": len(huge), "sha": "huge"},
+            {"path": "late.txt", "type": "blob", "mode": "100644", "size": len(late), "sha": "late"},
+        ]
+        client = _FakeClient(tree, blobs={"late": late, "huge": huge})
+        self._use(client)
+
+        counts = gh.count_vba_related_files_in_tree("token", "alice/repo", tree)
+
+        # The Sub after the first 64 KiB is found, the huge blob is only read up to the cap
+        self.assertEqual(counts[".txt"], 1)
+        self.assertLessEqual(client.responses[0].bytes_read, gh.VBA_PROBE_MAX_BYTES + gh.VBA_PROBE_CHUNK_BYTES)
+
+    def test_extension_stops_being_probed_once_it_has_vba_code(self):
+        tree = [{"path": f"scripts/{i}.vbs", "type": "blob", "mode": "100644", "size": 22, "sha": "s1"} for i in range(5)]
+        client = _FakeClient(tree)
+        self._use(client)
+
+        counts = gh.count_vba_related_files_in_tree("token", "alice/repo", tree)
+
+        self.assertEqual(counts[".vbs"], 1)
+        self.assertEqual(len(client.blobs), 1)
+
+    def test_too_many_blobs_to_probe_falls_back_to_clone(self):
+        tree = [{"path": f"notes/{i}.txt", "type": "blob", "mode": "100644", "size": 16, "sha": "s2"} for i in range(4)]
+        client = _FakeClient(tree)
+        self._use(client)
+        self.addCleanup(setattr, gh, "TREE_PROBE_LIMIT", gh.TREE_PROBE_LIMIT)
+        self.addCleanup(setattr, gh, "is_repo_empty", gh.is_repo_empty)
+        gh.is_repo_empty = lambda repo_path: True
+
+        self.assertIsNone(gh.count_vba_related_files_in_tree("token", "alice/repo", tree, max_probes=3))
+        self.assertEqual(len(client.blobs), 3)
+
+        gh.TREE_PROBE_LIMIT = 3
+        scan_and_suggest.analyze_repo("token", search_item(None), set())
+
+        self.assertEqual(self.clones, ["https://github.com/alice/repo"])
+
+    def test_gitattributes_patterns(self):
+        self.assertTrue(gh.gitattributes_pattern_matches("*.xlsm", "deep/Book.xlsm"))
+        self.assertTrue(gh.gitattributes_pattern_matches("/docs/*.xlsm", "docs/Book.xlsm"))
+        self.assertFalse(gh.gitattributes_pattern_matches("docs/*.xlsm", "docs/old/Book.xlsm"))
+        self.assertTrue(gh.gitattributes_pattern_matches("docs/**/*.xlsm", "docs/old/Book.xlsm"))
+        self.assertTrue(gh.gitattributes_pattern_matches("**/Book.xlsm", "Book.xlsm"))
+        self.assertTrue(gh.gitattributes_pattern_matches("assets/**", "assets/a/b.xlsm"))
+
+    def test_extension_checks_run_without_cloning(self):
+        self._use(_FakeClient(TREE))
+
+        scan_and_suggest.analyze_repo("token", search_item("VBScript"), set())
+
+        self.assertEqual(self.clones, [])
+        self.assertEqual(self.reported[0][".vbs"], 1)
+
+    def test_xvba_modules_folder_is_found_in_tree(self):
+        self._use(_FakeClient(TREE + [{"path": "xvba_modules", "type": "tree", "sha": "t2"}]))
+
+        scan_and_suggest.analyze_repo("token", search_item(None), set())
+
+        self.assertEqual(self.queued, [1108])
+        self.assertEqual(self.reported, [])
+
+    def test_truncated_tree_falls_back_to_clone(self):
+        self._use(_FakeClient(TREE, truncated=True))
+        self.addCleanup(setattr, gh, "is_repo_empty", gh.is_repo_empty)
+        gh.is_repo_empty = lambda repo_path: True
+
+        scan_and_suggest.analyze_repo("token", search_item("VBScript"), set())
+
+        self.assertEqual(self.clones, ["https://github.com/alice/repo"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""Unit tests for the store of scan results used to skip repos already scanned at the same commit."""
+import datetime
+import os
+import sys
+import tempfile
+import types
+import unittest
+
+# Make sure we can import workflow helpers from the workflows directory.
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+WORKFLOWS_DIR = os.path.join(ROOT_DIR, ".github", "workflows")
+if WORKFLOWS_DIR not in sys.path:
+    sys.path.insert(0, WORKFLOWS_DIR)
+
+if "requests" not in sys.modules:
+    sys.modules["requests"] = types.SimpleNamespace()
+
+import gh  # noqa: E402
+import issue_snapshot  # noqa: E402
+import scan_and_suggest  # noqa: E402
+from scan_store import SCAN_TTL, ScanStore  # noqa: E402
+from tests.fakes import search_item  # noqa: E402
+
+NOW = datetime.datetime(2024, 3, 10, 12, 0, 0, tzinfo=datetime.timezone.utc)
+
+
+class ScanStoreTests(unittest.TestCase):
+    def test_result_is_fresh_for_the_same_push_until_ttl(self):
+        store = ScanStore()
+        store.record("alice/repo", "abc", "analysed", now=NOW)
+
+        self.assertTrue(store.is_fresh("alice/repo", "abc", now=NOW + datetime.timedelta(days=1)))
+        self.assertFalse(store.is_fresh("alice/repo", "def", now=NOW))
+        self.assertFalse(store.is_fresh("alice/repo", None, now=NOW))
+        self.assertFalse(store.is_fresh("bob/repo", "abc", now=NOW))
+        self.assertFalse(store.is_fresh("alice/repo", "abc", now=NOW + SCAN_TTL))
+
+    def test_prune_and_round_trip(self):
+        store = ScanStore()
+        store.record("alice/old", "111", "analysed", now=NOW - SCAN_TTL - datetime.timedelta(days=1))
+        store.record("alice/repo", "abc", "issue", now=NOW)
+        store.prune(now=NOW)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "cache", "scan-results.tsv")
+            store.save(path)
+            with open(path, encoding="utf-8") as file:
+                lines = file.read().splitlines()
+            loaded = ScanStore.load(path)
+
+        self.assertEqual(lines, ["alice/repo\tabc\t2024-03-10T12:00:00+00:00\tissue"])
+        self.assertEqual(loaded.get("alice/repo").outcome, "issue")
+        self.assertEqual(len(loaded), 1)
+
+
+class AnalyzeRepoScanStoreTests(unittest.TestCase):
+    def setUp(self):
+        for module, name in ((gh, "clone_repo"), (gh, "get_remote_head"), (scan_and_suggest, "issue_snapshot"),
+                             (scan_and_suggest, "scan_store"), (scan_and_suggest, "analyze_repo_clone")):
+            self.addCleanup(setattr, module, name, getattr(module, name))
+
+        self.analysed = []
+        gh.get_remote_head = lambda url: self.fail("The scan store shouldn't need the HEAD of the remote")
+        scan_and_suggest.analyze_repo_clone = lambda token, repo, repo_path: self.analysed.append(repo_path) or "analysed"
+        scan_and_suggest.issue_snapshot = issue_snapshot.IssueSnapshot()
+        scan_and_suggest.scan_store = ScanStore()
+
+    def test_repo_scanned_since_its_last_push_is_skipped(self):
+        scan_and_suggest.analyze_repo("token", search_item("VBA", 10), set())
+        self.assertEqual(scan_and_suggest.scan_store.get("alice/repo").pushed_at, "2024-01-01T00:00:00Z")
+        self.assertFalse(scan_and_suggest.will_clone(search_item("VBA", 10), set()))
+
+        scan_and_suggest.analyze_repo("token", search_item("VBA", 10), set())
+
+        self.assertEqual(len(self.analysed), 1)
+
+    def test_repo_is_scanned_again_after_a_new_push(self):
+        scan_and_suggest.scan_store.record("alice/repo", "2023-12-01T00:00:00Z", "analysed")
+
+        scan_and_suggest.analyze_repo("token", search_item("VBA", 10), set())
+
+        self.assertEqual(len(self.analysed), 1)
+        self.assertEqual(scan_and_suggest.scan_store.get("alice/repo").pushed_at, "2024-01-01T00:00:00Z")
+
+
+if __name__ == "__main__":
+    unittest.main()
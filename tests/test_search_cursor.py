@@ -0,0 +1,63 @@
+"""Unit tests for the search cursor persisted between scans."""
+import datetime
+import os
+import sys
+import tempfile
+import types
+import unittest
+
+# Make sure we can import workflow helpers from the workflows directory.
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+WORKFLOWS_DIR = os.path.join(ROOT_DIR, ".github", "workflows")
+if WORKFLOWS_DIR not in sys.path:
+    sys.path.insert(0, WORKFLOWS_DIR)
+
+if "requests" not in sys.modules:
+    sys.modules["requests"] = types.SimpleNamespace()
+
+from search_cursor import OVERLAP, SearchCursor, parse_timestamp  # noqa: E402
+
+
+class SearchCursorTests(unittest.TestCase):
+    def test_first_run_looks_back_a_few_days(self):
+        now = datetime.datetime(2024, 3, 10, 12, 0, 0, tzinfo=datetime.timezone.utc)
+        self.assertEqual(SearchCursor().start(now), datetime.datetime(2024, 3, 3, 12, 0, 0, tzinfo=datetime.timezone.utc))
+
+    def test_only_repos_pushed_again_are_new(self):
+        cursor = SearchCursor()
+        repo = {"id": 1, "pushed_at": "2024-03-01T10:00:00Z"}
+        self.assertTrue(cursor.is_new(repo))
+
+        cursor.mark_seen(repo)
+        self.assertFalse(cursor.is_new(repo))
+        self.assertTrue(cursor.is_new({"id": 1, "pushed_at": "2024-03-02T08:00:00Z"}))
+
+    def test_complete_moves_the_high_water_mark(self):
+        cursor = SearchCursor()
+        cursor.mark_seen({"id": 1, "pushed_at": "2024-02-01T00:00:00Z"})
+        cursor.mark_seen({"id": 7, "pushed_at": "2024-03-01T10:00:00Z"})
+        cursor.mark_seen({"id": 3, "pushed_at": "2024-03-01T10:00:00Z"})
+
+        cursor.complete()
+
+        self.assertEqual((cursor.pushed_at, cursor.repo_id), ("2024-03-01T10:00:00Z", 7))
+        self.assertEqual(cursor.start(), parse_timestamp("2024-03-01T10:00:00Z") - OVERLAP)
+        # Repos far behind the mark can't come back in the search window
+        self.assertEqual(sorted(cursor.seen), [3, 7])
+
+    def test_save_and_load_round_trip(self):
+        cursor = SearchCursor("2024-03-01T10:00:00Z", 7, {7: "2024-03-01T10:00:00Z"})
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "cache", "search-cursor.json")
+            cursor.save(path)
+            loaded = SearchCursor.load(path)
+            missing = SearchCursor.load(os.path.join(tmp_dir, "missing.json"))
+
+        self.assertEqual((loaded.pushed_at, loaded.repo_id), ("2024-03-01T10:00:00Z", 7))
+        self.assertFalse(loaded.is_new({"id": 7, "pushed_at": "2024-03-01T10:00:00Z"}))
+        self.assertIsNone(missing.pushed_at)
+
+
+if __name__ == "__main__":
+    unittest.main()
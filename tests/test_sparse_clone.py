@@ -0,0 +1,123 @@
+"""Tests for the blobless sparse clone and its reuse between runs, run against a local repository."""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import types
+import unittest
+
+# Make sure we can import workflow helpers from the workflows directory.
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+WORKFLOWS_DIR = os.path.join(ROOT_DIR, ".github", "workflows")
+if WORKFLOWS_DIR not in sys.path:
+    sys.path.insert(0, WORKFLOWS_DIR)
+
+if "requests" not in sys.modules:
+    sys.modules["requests"] = types.SimpleNamespace()
+
+import gh  # noqa: E402
+import scan_and_suggest  # noqa: E402
+import utils  # noqa: E402
+
+FILES = {
+    "src/Module1.bas": b"Attribute VB_Name = \"Module1\"\nPublic Sub Main()\nEnd Sub\n",
+    "src/Form.frm": b"VERSION 5.00\nBegin VB.Form Form\nEnd\nPrivate Sub Form_Load()\nEnd Sub\n",
+    "src.v2/Macro": b"Sub Hello()\nEnd Sub\n",
+    "Book.xlsm": b"PK\x03\x04" + bytes(range(256)) * 64,
+    "assets/logo.png": b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 64,
+    "xvba_modules/lib/index.js": b"module.exports = {};\n",
+}
+
+
+def _git(*args, cwd):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+@unittest.skipIf(shutil.which("git") is None, "git is not available")
+class SparseCloneTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.source = source = os.path.join(self.directory.name, "alice", "repo")
+        for path, content in FILES.items():
+            os.makedirs(os.path.dirname(os.path.join(source, path)), exist_ok=True)
+            with open(os.path.join(source, path), "wb") as file:
+                file.write(content)
+        _git("init", "--quiet", cwd=source)
+        _git("add", "-A", cwd=source)
+        _git("-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "--quiet", "-m", "init", cwd=source)
+        _git("config", "uploadpack.allowFilter", "true", cwd=source)
+
+        work_dir = os.path.join(self.directory.name, "work")
+        os.makedirs(work_dir)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(work_dir)
+
+        self.url = "file://" + source.replace(os.sep, "/")
+        gh.clone_repo(self.url)
+        self.repo_path = utils.repo_path("alice", "repo")
+
+    def test_only_vba_related_files_are_checked_out(self):
+        self.assertTrue(os.path.exists(os.path.join(self.repo_path, "src", "Module1.bas")))
+        self.assertTrue(os.path.exists(os.path.join(self.repo_path, "src.v2", "Macro")))
+        self.assertFalse(os.path.exists(os.path.join(self.repo_path, "Book.xlsm")))
+        self.assertFalse(os.path.exists(os.path.join(self.repo_path, "assets", "logo.png")))
+
+        missing = subprocess.run(["git", "rev-list", "--objects", "--missing=print", "HEAD"],
+                                 cwd=self.repo_path, capture_output=True, text=True).stdout
+        self.assertEqual(sum(1 for line in missing.splitlines() if line.startswith("?")), 3)
+
+    def test_checks_see_files_outside_the_checkout(self):
+        counts = gh.count_vba_related_files(self.repo_path)
+
+        self.assertEqual(counts[".bas"], 1)
+        self.assertEqual(counts[".frm"], 1)
+        self.assertEqual(counts["No ext"], 1)
+        self.assertEqual(counts[".xlsm"], 1)
+        self.assertFalse(gh.is_repo_empty(self.repo_path))
+        self.assertTrue(scan_and_suggest.has_xvba_modules_folder(self.repo_path))
+        self.assertEqual([line.split()[-1] for line in gh.get_git_ls_files_output(self.repo_path)], ["src/Form.frm"])
+
+        # Everything above came from the index: no blob outside the checkout was downloaded
+        missing = subprocess.run(["git", "rev-list", "--objects", "--missing=print", "HEAD"],
+                                 cwd=self.repo_path, capture_output=True, text=True).stdout
+        self.assertEqual(sum(1 for line in missing.splitlines() if line.startswith("?")), 3)
+
+    def test_existing_clone_is_reused_until_head_moves(self):
+        original_count = gh.count_vba_related_files
+        self.addCleanup(setattr, gh, "count_vba_related_files", original_count)
+        first_sha = gh.get_head_sha(self.repo_path)
+        first_counts = gh.get_vba_related_file_counts(self.repo_path)
+
+        # Same HEAD: no fetch and the counts of the previous analysis are reused
+        gh.count_vba_related_files = lambda repo_path: self.fail("The counts should come from the cache")
+        gh.clone_repo(self.url)
+        self.assertEqual(gh.get_head_sha(self.repo_path), first_sha)
+        self.assertEqual(gh.get_vba_related_file_counts(self.repo_path), first_counts)
+
+        # New commit upstream: the clone is fetched and the files are counted again
+        with open(os.path.join(self.source, "src", "Class1.cls"), "wb") as file:
+            file.write(b"VERSION 1.0 CLASS\nBEGIN\nEND\n")
+        _git("add", "-A", cwd=self.source)
+        _git("-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "--quiet", "-m", "class", cwd=self.source)
+        gh.count_vba_related_files = original_count
+
+        gh.clone_repo(self.url)
+
+        self.assertNotEqual(gh.get_head_sha(self.repo_path), first_sha)
+        self.assertTrue(os.path.exists(os.path.join(self.repo_path, "src", "Class1.cls")))
+        self.assertFalse(os.path.exists(os.path.join(self.repo_path, "Book.xlsm")))
+        self.assertEqual(gh.get_vba_related_file_counts(self.repo_path)[".cls"], 1)
+
+    def test_known_remote_head_saves_the_ls_remote(self):
+        self.addCleanup(setattr, gh, "get_remote_head", gh.get_remote_head)
+        self.addCleanup(gh.remote_heads.clear)
+        gh.get_remote_head = lambda url: self.fail("The HEAD resolved by GraphQL should be used")
+        gh.remote_heads[self.url] = gh.get_head_sha(self.repo_path)
+
+        self.assertTrue(gh.clone_repo(self.url))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+"""Unit tests for the disk budget of the clones kept under repos/."""
+import os
+import sys
+import tempfile
+import types
+import unittest
+
+# Make sure we can import workflow helpers from the workflows directory.
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+WORKFLOWS_DIR = os.path.join(ROOT_DIR, ".github", "workflows")
+if WORKFLOWS_DIR not in sys.path:
+    sys.path.insert(0, WORKFLOWS_DIR)
+
+if "requests" not in sys.modules:
+    sys.modules["requests"] = types.SimpleNamespace()
+
+import issue_snapshot  # noqa: E402
+import scan_and_suggest  # noqa: E402
+import utils  # noqa: E402
+from clone_pool import ClonePool  # noqa: E402
+from tests.fakes import search_item  # noqa: E402
+from workspace import Workspace  # noqa: E402
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        self.now += 1
+        return self.now
+
+
+class WorkspaceTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.root = self.directory.name
+        self.clock = _FakeClock()
+
+    def _clone(self, folder, size):
+        path = os.path.join(self.root, folder)
+        os.makedirs(os.path.join(path, ".git"), exist_ok=True)
+        with open(os.path.join(path, ".git", "pack"), "wb") as file:
+            file.write(b"x" * size)
+        return path
+
+    def test_released_clone_can_be_removed_right_away(self):
+        workspace = Workspace(self.root, budget=10_000, clock=self.clock)
+        path = os.path.join(self.root, "alice --- repo")
+        workspace.lease(path)
+        self._clone("alice --- repo", 100)
+
+        workspace.release(path, keep=False)
+
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(workspace.total_size(), 0)
+
+    def test_least_recently_used_clones_are_evicted_over_budget(self):
+        workspace = Workspace(self.root, budget=250, clock=self.clock)
+        paths = []
+        for name in ("a", "b", "c"):
+            path = os.path.join(self.root, name)
+            workspace.lease(path)
+            self._clone(name, 100)
+            paths.append(path)
+        workspace.release(paths[0])
+        workspace.release(paths[1])
+
+        # "c" is still leased: "a" is evicted although "c" pushes the total over budget
+        workspace.release(paths[2])
+
+        self.assertEqual([os.path.exists(path) for path in paths], [False, True, True])
+        self.assertEqual(workspace.total_size(), 200)
+
+    def test_leased_clone_is_never_evicted(self):
+        workspace = Workspace(self.root, budget=50, clock=self.clock)
+        busy = os.path.join(self.root, "busy")
+        workspace.lease(busy)
+        self._clone("busy", 100)
+
+        workspace.evict()
+
+        self.assertTrue(os.path.exists(busy))
+
+    def test_index_survives_between_runs(self):
+        self._clone("restored", 100)
+        first = Workspace(self.root, budget=10_000, clock=self.clock)
+        path = os.path.join(self.root, "recent")
+        first.lease(path)
+        self._clone("recent", 100)
+        first.release(path)
+
+        # The folder without bookkeeping is older than anything that was used
+        second = Workspace(self.root, budget=150, clock=self.clock)
+        second.evict()
+
+        self.assertFalse(os.path.exists(os.path.join(self.root, "restored")))
+        self.assertTrue(os.path.exists(path))
+
+
+def _issue(number, title, state):
+    return issue_snapshot.IssueRecord(number=number, title=title, state=state, user=utils.get_user_from_title(title))
+
+
+class AnalyzeRepoLeaseTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        for name in ("issue_snapshot", "clone_pool", "workspace", "scan_store"):
+            self.addCleanup(setattr, scan_and_suggest, name, getattr(scan_and_suggest, name))
+        scan_and_suggest.scan_store = None
+        scan_and_suggest.workspace = Workspace(self.directory.name, budget=10_000, clock=_FakeClock())
+        self.repo_path = os.path.join(self.directory.name, utils.unique_folder("alice", "repo"))
+
+    def _clone(self, url):
+        os.makedirs(os.path.join(self.repo_path, ".git"), exist_ok=True)
+        return True
+
+    def test_prefetched_clone_is_released_when_the_analysis_stops_early(self):
+        # An issue was opened for the same user after the clone was started
+        scan_and_suggest.issue_snapshot = issue_snapshot.IssueSnapshot([_issue(1, "[alice/other] Check A", "open")])
+
+        with ClonePool(self._clone, interval=0) as pool:
+            scan_and_suggest.clone_pool = pool
+            scan_and_suggest.workspace.lease(self.repo_path)
+            repo = search_item("VBA", 100)
+            pool.submit(repo["html_url"])
+
+            scan_and_suggest.analyze_repo("token", repo, set())
+
+            self.assertFalse(pool.submitted(repo["html_url"]))
+        self.assertFalse(os.path.exists(self.repo_path))
+        self.assertEqual(scan_and_suggest.workspace.leased, set())
+
+    def test_only_open_issues_keep_the_clone(self):
+        scan_and_suggest.issue_snapshot = issue_snapshot.IssueSnapshot([_issue(1, "[alice/repo] Check E", "closed")])
+        self.assertFalse(scan_and_suggest.has_issue_for_repo(search_item()))
+
+        scan_and_suggest.issue_snapshot.upsert(_issue(2, "[alice/repo] Check F", "open"))
+        self.assertTrue(scan_and_suggest.has_issue_for_repo(search_item()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""Unit tests for the write-through issue cache in gh.py."""
+import os
+import sys
+import types
+import unittest
+
+# Make sure we can import workflow helpers from the workflows directory.
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+WORKFLOWS_DIR = os.path.join(ROOT_DIR, ".github", "workflows")
+if WORKFLOWS_DIR not in sys.path:
+    sys.path.insert(0, WORKFLOWS_DIR)
+
+if "requests" not in sys.modules:
+    sys.modules["requests"] = types.SimpleNamespace()
+
+import gh  # noqa: E402
+from tests.fakes import FakeIssuesClient  # noqa: E402
+
+
+class WriteThroughCacheTests(unittest.TestCase):
+    def setUp(self):
+        gh.reset_issue_caches()
+        self.addCleanup(gh.reset_issue_caches)
+        original_get_client = gh.get_client
+        original_get_all_issues = gh.get_all_issues
+        self.addCleanup(setattr, gh, "get_client", original_get_client)
+        self.addCleanup(setattr, gh, "get_all_issues", original_get_all_issues)
+
+        self.client = FakeIssuesClient(next_number=42)
+        gh.get_client = lambda _token=None: self.client
+        gh.get_all_issues = lambda *_args, **_kwargs: []
+        self.snapshot = gh.get_issue_snapshot("token", "owner/repo")
+
+    def test_created_issue_is_readable_without_refetching(self):
+        number = gh.create_github_issue("token", "owner/repo", "[alice/repo] is detected as VBScript", "body", ["external", "Check B"])
+
+        self.assertEqual(number, 42)
+        self.assertTrue(self.snapshot.has_open_issue_for_user("alice"))
+        self.assertEqual(gh.get_issue("token", "owner/repo", 42)["body"], "body")
+        self.assertEqual(self.client.gets, [])
+
+    def test_mutations_update_cached_issue(self):
+        gh.create_github_issue("token", "owner/repo", "[alice/repo] is detected as VBScript", "body", ["Check B"])
+
+        gh.update_issue("token", "owner/repo", 42, "new body", title="[alice/renamed] is detected as VBScript")
+        gh.add_label_to_issue("token", "owner/repo", 42, "completed")
+        gh.remove_label_from_issue("token", "owner/repo", 42, "Check B")
+        gh.close_issue("token", "owner/repo", {"number": 42}, "completed")
+
+        issue = gh.get_issue("token", "owner/repo", 42)
+        self.assertEqual(issue["body"], "new body")
+        self.assertEqual(issue["state"], "closed")
+        self.assertEqual(self.snapshot.get(42).labels, ["completed"])
+        self.assertEqual(self.snapshot.find_closed_by_title("[alice/renamed] is detected as VBScript").number, 42)
+        self.assertEqual(self.client.gets, [])
+
+
+if __name__ == "__main__":
+    unittest.main()